@@ -0,0 +1,119 @@
+"""HTTP service around ResumeAgent.
+
+Uploads are queued and processed by background workers; clients poll the
+job or follow its server-sent events, then download the renders by job id.
+
+Run with:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+"""
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+
+from src.agent.job_queue import JobQueue
+from src.tools.llm_gateway import awarm_up
+from src.tools.render_service import TEMPLATES
+from src.tools.tracing_service import get_tracer
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+# Upper bound on best-of-N enhancement samples per job
+MAX_CANDIDATES = 5
+MEDIA_TYPES = {
+    'docx': "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    'pdf': "application/pdf",
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.jobs = JobQueue(
+        workers=int(os.getenv("API_WORKERS", 2)),
+        max_queued=int(os.getenv("API_MAX_QUEUED", 100))
+    )
+    await app.state.jobs.start()
+    # Workers share the process-wide connection pool, so open it before the first job
+    app.state.warm_up = asyncio.create_task(awarm_up())
+    yield
+    await app.state.jobs.stop()
+
+
+app = FastAPI(title="AI Resume Builder", lifespan=lifespan)
+
+
+def _job(job_id: str):
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...), template_style: str = Form("professional"),
+                     job_description: str = Form(""), candidates: int = Form(1)):
+    """Queue a resume upload and return its job id immediately"""
+    if os.path.splitext(file.filename or "")[1].lower() not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=415, detail="Unsupported file type")
+    if template_style not in TEMPLATES:
+        raise HTTPException(status_code=422, detail=f"template_style must be one of {', '.join(TEMPLATES)}")
+    if not 1 <= candidates <= MAX_CANDIDATES:
+        raise HTTPException(status_code=422, detail=f"candidates must be between 1 and {MAX_CANDIDATES}")
+    try:
+        job = app.state.jobs.submit({
+            "file_bytes": await file.read(),
+            "filename": file.filename,
+            "template_style": template_style,
+            "job_description": job_description,
+            "candidates": candidates
+        })
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Too many queued jobs, retry later",
+                            headers={"Retry-After": "30"})
+    return {"job_id": job.id, "status": job.status}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status with per-stage progress, plus scores and text once done"""
+    return _job(job_id).summary()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events for each stage start/finish and the final status"""
+    job = _job(job_id)
+
+    async def stream():
+        async for event in app.state.jobs.events(job):
+            yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get("/jobs/{job_id}/resume.{kind}")
+async def download(job_id: str, kind: str):
+    """Rendered DOCX or PDF of a finished job"""
+    if kind not in MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Artifacts are resume.docx and resume.pdf")
+    job = _job(job_id)
+    if job.status != 'done':
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return Response(
+        job.result[f"{kind}_bytes"], media_type=MEDIA_TYPES[kind],
+        headers={"Content-Disposition": f'attachment; filename="Enhanced_Resume_{job.result["template_style"]}.{kind}"'}
+    )
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "queued": app.state.jobs.queued}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage pipeline metrics in Prometheus text format"""
+    return get_tracer().prometheus_text()
@@ -1,8 +1,10 @@
 import streamlit as st
-from src.agent.ResumeAgent import ResumeAgent
-import tempfile
+from src.tools.tracing_service import start_metrics_server
+import asyncio
+import threading
+import time
 import os
-import shutil
+import uuid
 
 # Initialize Streamlit page
 st.set_page_config(
@@ -23,13 +25,18 @@ def load_css():
 
 load_css()
 
-# Load AI resume agent once
+# Load AI resume agent once, on first use, so the page renders before the pipeline is imported
 @st.cache_resource
 def load_agent():
+    from src.agent.ResumeAgent import ResumeAgent
+    from src.tools.llm_gateway import warm_up
+    # Per-stage latency, token and cache metrics for Prometheus to scrape
+    if os.getenv("METRICS_PORT"):
+        start_metrics_server(int(os.getenv("METRICS_PORT")))
+    # The TLS/HTTP2 handshake overlaps parsing instead of delaying the first enhancement
+    threading.Thread(target=warm_up, name="llm-warm-up", daemon=True).start()
     return ResumeAgent()
 
-agent = load_agent()
-
 # Header section
 st.markdown("""
 <div class="app-header">
@@ -56,6 +63,12 @@ with st.sidebar:
         "academic": "🎓 Research-focused - perfect for academic positions"
     }
     st.info(template_info[template_style])
+
+    job_description = st.text_area(
+        "🎯 Target job description (optional)",
+        height=150,
+        help="Paste a job posting to score keywords against it instead of generic terms"
+    )
     st.markdown('</div>', unsafe_allow_html=True)
 
     st.markdown("---")
@@ -76,99 +89,160 @@ st.markdown('<div class="info-card">', unsafe_allow_html=True)
 uploaded_file = st.file_uploader("📤 Upload Your Resume (PDF or DOCX)", type=["pdf", "docx"])
 st.markdown('</div>', unsafe_allow_html=True)
 
+# One store entry per browser session lets template switches skip the LLM pipeline
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+# Reserve the score card above the enhanced text, which streams in first
+scores_container = st.container()
+text_container = st.container()
+enhanced_placeholder = None
+
+def enhanced_text_card():
+    with text_container:
+        st.markdown('<div class="info-card">', unsafe_allow_html=True)
+        st.subheader("✨ Enhanced Resume Text")
+        placeholder = st.empty()
+        st.markdown('</div>', unsafe_allow_html=True)
+    return placeholder
+
+def reenhance_edits(template_style, job_description):
+    """Re-enhance the edited text, sending only the sections that changed"""
+    previous = st.session_state["result"]
+    try:
+        result = asyncio.run(load_agent().aprocess_resume({
+            "resume_text": st.session_state["enhanced_resume"],
+            "incremental": True,
+            "template_style": template_style,
+            "job_description": job_description,
+            "session_id": session_id
+        }))
+    except Exception as e:
+        st.session_state["reenhance_error"] = str(e)
+        return
+    # Keep comparing against the uploaded resume, not the edited text
+    result['original_text'] = previous['original_text']
+    result['initial_score'] = previous['initial_score']
+    st.session_state["result"] = result
+    st.session_state["enhanced_resume"] = result['enhanced_text']
+
 # Process resume when user clicks enhance
 if st.button("🚀 Enhance My Resume"):
     if not uploaded_file:
         st.warning("⚠️ Please upload a resume file first.")
     else:
-        # Create temporary workspace
-        temp_dir = tempfile.mkdtemp()
-        file_ext = os.path.splitext(uploaded_file.name)[-1]
-        file_path = os.path.join(temp_dir, f"uploaded_resume{file_ext}")
-
         try:
-            # Save uploaded file locally
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.read())
+            # Show enhanced resume text as it is generated
+            enhanced_placeholder = enhanced_text_card()
+            streamed_chunks = []
+            last_refresh = [0.0]
+
+            def show_token(token):
+                streamed_chunks.append(token)
+                # Throttle redraws so long generations do not flood the browser
+                now = time.monotonic()
+                if now - last_refresh[0] >= 0.1:
+                    last_refresh[0] = now
+                    enhanced_placeholder.code("".join(streamed_chunks), language=None, wrap_lines=True)
 
             # Run AI resume enhancement
+            st.session_state.pop("enhanced_resume", None)
             with st.spinner("⏳ Processing your resume..."):
-                result = agent.process_resume({
-                    "file_path": file_path,
-                    "template_style": template_style
-                })
-
-            # Show ATS scores
-            st.markdown('<div class="info-card">', unsafe_allow_html=True)
-            st.subheader("📊 ATS Score Comparison")
-            col1, col2, col3 = st.columns(3)
-
-            with col1:
-                st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-                st.metric("Initial ATS Score",
-                          f"{result['initial_score']['score']}/{result['initial_score']['max_score']}")
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            with col2:
-                st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-                st.metric("Enhanced Score",
-                          f"{result['final_score']['score']}/{result['final_score']['max_score']}",
-                          delta=f"+{result['final_score']['score'] - result['initial_score']['score']}")
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            with col3:
-                st.markdown('<div class="metric-container">', unsafe_allow_html=True)
-                improvement = (
-                    (result['final_score']['score'] - result['initial_score']['score'])
-                    / result['initial_score']['score'] * 100
-                )
-                st.metric("Improvement", f"{improvement:.1f}%")
-                st.markdown('</div>', unsafe_allow_html=True)
+                # Upload bytes are parsed in memory and cached by content hash
+                st.session_state["result"] = asyncio.run(load_agent().aprocess_resume({
+                    "file_bytes": uploaded_file.getvalue(),
+                    "filename": uploaded_file.name,
+                    "template_style": template_style,
+                    "job_description": job_description,
+                    "session_id": session_id
+                }, on_token=show_token))
 
-            st.markdown('</div>', unsafe_allow_html=True)
+        except Exception as e:
+            st.session_state.pop("result", None)
+            st.error(f"❌ Error while processing: {e}")
 
-            # Show enhanced resume text
-            st.markdown('<div class="info-card">', unsafe_allow_html=True)
-            st.subheader("✨ Enhanced Resume Text")
-            st.text_area("AI-Enhanced Resume",
-                         result['enhanced_text'],
-                         height=400,
-                         key="enhanced_resume")
+# Results persist across reruns, so changing the template only re-renders
+result = st.session_state.get("result")
+if result and result['template_style'] != template_style:
+    try:
+        result.update(load_agent().rerender(session_id, template_style))
+    except KeyError:
+        st.warning("⚠️ Your previous resume has expired. Please click Enhance again.")
+        result = None
+        st.session_state.pop("result", None)
+
+if result:
+    if enhanced_placeholder is None:
+        enhanced_placeholder = enhanced_text_card()
+    # The text area holds the user's edits until the next enhancement replaces them
+    st.session_state.setdefault("enhanced_resume", result['enhanced_text'])
+    enhanced_placeholder.text_area("AI-Enhanced Resume",
+                                   height=400,
+                                   key="enhanced_resume")
+    st.button("🔁 Re-enhance My Edits", on_click=reenhance_edits, args=(template_style, job_description),
+              help="Only the sections you changed are sent to the AI again")
+    if "reenhance_error" in st.session_state:
+        st.error(f"❌ Error while re-enhancing: {st.session_state.pop('reenhance_error')}")
+    if result.get('truncated'):
+        st.warning("⚠️ Your resume was longer than the parsing limit, so only its first part was enhanced.")
+
+    # Show ATS scores
+    with scores_container:
+        st.markdown('<div class="info-card">', unsafe_allow_html=True)
+        st.subheader("📊 ATS Score Comparison")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+            st.metric("Initial ATS Score",
+                      f"{result['initial_score']['score']}/{result['initial_score']['max_score']}")
             st.markdown('</div>', unsafe_allow_html=True)
 
-            # Download section
-            st.markdown('<div class="info-card">', unsafe_allow_html=True)
-            st.subheader("📥 Download Your Resume")
-            col1, col2 = st.columns(2)
-
-            with col1:
-                with open(result['docx_path'], "rb") as docx_file:
-                    st.download_button(
-                        label="📄 Download Word Resume (.docx)",
-                        data=docx_file,
-                        file_name=f"Enhanced_Resume_{template_style}.docx",
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
-
-            with col2:
-                with open(result['pdf_path'], "rb") as pdf_file:
-                    st.download_button(
-                        label="📑 Download PDF Resume (.pdf)",
-                        data=pdf_file,
-                        file_name=f"Enhanced_Resume_{template_style}.pdf",
-                        mime="application/pdf"
-                    )
+        with col2:
+            st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+            st.metric("Enhanced Score",
+                      f"{result['final_score']['score']}/{result['final_score']['max_score']}",
+                      delta=f"+{result['final_score']['score'] - result['initial_score']['score']}")
+            st.markdown('</div>', unsafe_allow_html=True)
 
+        with col3:
+            st.markdown('<div class="metric-container">', unsafe_allow_html=True)
+            improvement = (
+                (result['final_score']['score'] - result['initial_score']['score'])
+                / result['initial_score']['score'] * 100
+            )
+            st.metric("Improvement", f"{improvement:.1f}%")
             st.markdown('</div>', unsafe_allow_html=True)
-            st.success(f"✅ Resume enhanced using **{template_style}** template!")
 
-        except Exception as e:
-            st.error(f"❌ Error while processing: {e}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Download section
+    st.markdown('<div class="info-card">', unsafe_allow_html=True)
+    st.subheader("📥 Download Your Resume")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.download_button(
+            label="📄 Download Word Resume (.docx)",
+            data=result['docx_bytes'],
+            file_name=f"Enhanced_Resume_{template_style}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+
+    with col2:
+        st.download_button(
+            label="📑 Download PDF Resume (.pdf)",
+            data=result['pdf_bytes'],
+            file_name=f"Enhanced_Resume_{template_style}.pdf",
+            mime="application/pdf"
+        )
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Per-stage latency breakdown
+    with st.expander("⏱️ Pipeline timings"):
+        st.json(result['timings'])
 
-        finally:
-            # Cleanup temporary files
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
+    st.success(f"✅ Resume enhanced using **{template_style}** template!")
 
 # Chat section for resume advice
 st.markdown("---")
@@ -179,7 +253,7 @@ user_query = st.text_input("Ask something like 'How can I improve my skills sect
 
 if user_query:
     with st.spinner("🤔 Thinking..."):
-        response = agent.chat(user_query)
+        response = load_agent().chat(user_query)
 
     st.markdown(f"""
     <div style="background: linear-gradient(135deg,#f5f7fa,#c3cfe2);
@@ -0,0 +1,44 @@
+import argparse
+import json
+
+from src.agent.batch_processor import BatchProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enhance a folder or manifest of resumes in bulk")
+    parser.add_argument("source", help="Directory of PDF/DOCX resumes, or a manifest (JSONL or one path per line)")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL results file, also used as the resume checkpoint")
+    parser.add_argument("--output-dir", default="output/batch", help="Directory for generated DOCX/PDF files")
+    parser.add_argument("--template", default="professional", choices=["professional", "modern", "academic"])
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for parsing and rendering")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum concurrent LLM calls")
+    parser.add_argument("--job-description", help="Text file with a job description to score keywords against")
+    parser.add_argument("--single-call", action="store_true",
+                        help="Enhance and extract in one structured LLM call, falling back to two calls")
+    parser.add_argument("--candidates", type=int, default=1,
+                        help="Enhancements sampled in parallel per resume, keeping the best ATS score")
+    parser.add_argument("--target-score", type=int, help="Stop sampling once a candidate reaches this ATS score")
+    args = parser.parse_args()
+
+    job_description = ""
+    if args.job_description:
+        with open(args.job_description, encoding="utf-8") as f:
+            job_description = f.read()
+
+    processor = BatchProcessor(
+        output_path=args.output,
+        output_dir=args.output_dir,
+        template_style=args.template,
+        max_workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        job_description=job_description,
+        single_call=args.single_call,
+        candidates=args.candidates,
+        target_score=args.target_score
+    )
+    summary = processor.run(args.source)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare ATSScorer.calculate_scores_batch against per-call calculate_score.
+
+Also checks that both paths produce identical breakdowns for every document.
+The batch path shares the per-document checks and only vectorises the
+aggregation, so expect about 1.2x in one process (20000 docs: 4.4s per-call,
+3.7s batch); --workers helps only when there are spare cores.
+
+Usage:
+    python -m benchmarks.bench_ats --docs 20000 --words 600
+"""
+import argparse
+import random
+import time
+
+from src.tools.ats_service import ATSScorer, SCORE_DTYPE
+
+VOCABULARY = (
+    "python java javascript react sql aws docker kubernetes agile team leadership "
+    "developed managed led created implemented designed achieved improved increased reduced "
+    "education experience skills revenue customers platform pipeline scaled shipped mentored "
+    "the of and to in for with on across by 30% 15+ $250000 5 years 18 months 2019 2023"
+).split()
+FILLER = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def synthetic_corpus(docs: int, words: int, seed: int = 0):
+    rng = random.Random(seed)
+    pool = VOCABULARY + FILLER * 6
+    corpus = []
+    for i in range(docs):
+        body = " ".join(rng.choice(pool) for _ in range(rng.randint(words // 2, words * 2)))
+        contact = f"candidate{i}@example.com 555-{i % 1000:03d}-{i % 10000:04d}" if i % 3 else ""
+        corpus.append(f"{contact}\n{body}")
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=1, help="Processes used by the batch path")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.docs, args.words)
+
+    started = time.perf_counter()
+    per_call = [ATSScorer.calculate_score(text) for text in corpus]
+    per_call_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = ATSScorer.calculate_scores_batch(corpus, workers=args.workers)
+    batch_seconds = time.perf_counter() - started
+
+    for i, result in enumerate(per_call):
+        assert batch['score'][i] == result['score'], f"score mismatch at document {i}"
+        for field in SCORE_DTYPE.names[1:]:
+            assert batch[field][i] == result['breakdown'][field], f"{field} mismatch at document {i}"
+
+    print(f"documents:   {args.docs}")
+    print(f"per-call:    {per_call_seconds:.3f}s ({args.docs / per_call_seconds:,.0f} docs/s)")
+    print(f"batch:       {batch_seconds:.3f}s ({args.docs / batch_seconds:,.0f} docs/s)")
+    print(f"speedup:     {per_call_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Check that pipeline runs reuse pooled LLM connections instead of reconnecting.
+
+Starts a local OpenAI-compatible mock of the Groq chat completions API that
+counts TCP connections, points GROQ_BASE_URL at it and runs the full
+pipeline (enhance, extract, score, render) several times, first through the
+sync and then the async entry point. A run that opens more connections
+than the peak number of concurrent requests it made is reconnecting instead
+of reusing the pool. No network access or API key is needed.
+
+Usage:
+    python -m benchmarks.bench_connections --runs 10
+    python -m benchmarks.bench_connections --serve 8090   # only run the mock server
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+# Prose the section extractor cannot resolve, so every field is requested from the mock
+ENHANCED_TEXT = ("Jordan Example is a backend engineer in Springfield who scaled payment services to "
+                 "10M requests per day, cut latency by 35% and led a team of 6 engineers. Reach Jordan "
+                 "at jordan@example.com. Skilled in Python, SQL and Kubernetes.")
+EXTRACTED_FIELDS = {
+    "personal_info": {"name": "Jordan Example", "email": "jordan@example.com", "phone": "",
+                      "location": "Springfield"},
+    "summary": "Backend engineer who scaled payment services to 10M requests per day.",
+    "education": [],
+    "skills": ["Python", "SQL", "Kubernetes"],
+    "experience": [{"title": "Backend Engineer", "company": "Example Payments", "duration": "2019 - Present",
+                    "description": "Cut latency by 35% and led a team of 6 engineers."}],
+    "projects": [],
+}
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """OpenAI-compatible chat completions endpoint with keep-alive, counting connections and requests"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.02):
+        super().__init__(("127.0.0.1", port), MockLLMHandler)
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connections = self.requests = self.peak_in_flight = 0
+
+    def start(self) -> "MockLLMServer":
+        threading.Thread(target=self.serve_forever, name="mock-llm", daemon=True).start()
+        return self
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests unless the client closes them
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        with self.server._lock:
+            self.server.requests += 1
+            request_number = self.server.requests
+            self.server._in_flight += 1
+            self.server.peak_in_flight = max(self.server.peak_in_flight, self.server._in_flight)
+        try:
+            time.sleep(self.server.latency)
+            prompt = body["messages"][-1]["content"]
+            # Unique enhanced text per request, so extraction results are never cached
+            content = json.dumps(EXTRACTED_FIELDS) if "JSON" in prompt else f"{ENHANCED_TEXT} Ref {request_number}."
+            if body.get("stream"):
+                self._reply(_sse(body["model"], content), "text/event-stream")
+            else:
+                self._reply(json.dumps(_completion(body["model"], content)).encode(), "application/json")
+        finally:
+            with self.server._lock:
+                self.server._in_flight -= 1
+
+    def _reply(self, data: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients close streams they stop reading, e.g. a best-of-N early exit
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _completion(model: str, content: str) -> dict:
+    tokens = max(1, len(content) // 4)
+    return {
+        "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": tokens, "completion_tokens": tokens, "total_tokens": 2 * tokens},
+    }
+
+
+def _sse(model: str, content: str) -> bytes:
+    events = []
+    for start in range(0, len(content), 40):
+        events.append({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": model, "choices": [{"index": 0, "delta": {"content": content[start:start + 40]},
+                                                    "finish_reason": None}]})
+    events.append({"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                   "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events).encode() + b"data: [DONE]\n\n"
+
+
+def run_suite(server: MockLLMServer, runs: int) -> int:
+    """Run the pipeline against the mock and return how many phases reconnected"""
+    from src.agent.ResumeAgent import ResumeAgent
+    from src.tools.cache_service import ResultCache
+    from src.tools.llm_gateway import LLMGateway
+
+    # Fresh caches and unlimited budgets, so every run calls the mock without waiting
+    agent = ResumeAgent(cache=ResultCache(":memory:"), parse_cache=ResultCache(":memory:"),
+                        gateway=LLMGateway(requests_per_minute=1e6, tokens_per_minute=1e9))
+
+    def resume(i: int) -> dict:
+        return {"resume_text": f"Jordan Example\nSUMMARY\nBackend engineer, run {i}.", "template_style": "modern"}
+
+    async def arun_all(offset: int):
+        for i in range(runs):
+            await agent.aprocess_resume(resume(offset + i))
+
+    failures = 0
+    phases = (("sync", lambda: [agent.process_resume(resume(i)) for i in range(runs)]),
+              ("async", lambda: asyncio.run(arun_all(runs))))
+    for name, run in phases:
+        server.reset()
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        reused = server.connections <= server.peak_in_flight
+        failures += not reused
+        print(f"{name:<6}{runs:>4} runs  {server.requests:>4} requests  {server.connections:>3} connections"
+              f"  peak {server.peak_in_flight} concurrent  {elapsed * 1000 / runs:8.1f} ms/run"
+              f"  {'ok' if reused else 'RECONNECTING'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Pipeline runs per entry point")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the mock takes per request")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Only serve the mock on this port")
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.serve or 0, args.latency)
+    if args.serve:
+        print(f"Mock Groq API on {server.base_url}; set GROQ_BASE_URL to use it")
+        server.serve_forever()
+        return
+
+    server.start()
+    os.environ["GROQ_BASE_URL"] = server.base_url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+    failures = run_suite(server, args.runs)
+    print(f"{failures} phase(s) reconnected instead of reusing connections")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
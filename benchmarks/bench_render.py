@@ -0,0 +1,131 @@
+"""Benchmark DOCX templates and PDF generation on synthetic resumes.
+
+Feeds EnhancedResume payloads with 1 to 50 experience entries and growing
+skill lists through every template and reports wall time, peak Python memory
+and output size. No network access is needed.
+
+Usage:
+    python -m benchmarks.bench_render --output benchmarks/render_baseline.json
+    python -m benchmarks.bench_render --compare benchmarks/render_baseline.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from pydantic_objects import EnhancedResume
+from src.tools.render_service import ResumeGenerator
+
+EXPERIENCE_COUNTS = (1, 5, 10, 25, 50)
+TEMPLATES = ("professional", "modern", "academic")
+
+
+def synthetic_resume(experiences: int) -> dict:
+    """A schema-valid resume whose size scales with the number of jobs"""
+    skills = [f"Skill {i} (Advanced Distributed Systems)" for i in range(10 + experiences * 4)]
+    resume = EnhancedResume(
+        personal_info={"name": "Jordan Example", "email": "jordan@example.com",
+                       "phone": "555-010-0100", "location": "Springfield"},
+        summary=" ".join(["Results-driven engineer delivering measurable impact across teams."] * 4),
+        education=[{"degree": f"M.Sc. Computer Science {i}", "institution": "State University",
+                    "year": str(2000 + i)} for i in range(max(1, experiences // 10))],
+        skills=skills,
+        experience=[{"title": f"Senior Engineer {i}", "company": f"Company {i}", "duration": "2018 - 2021",
+                     "description": "Developed and scaled services handling 10M+ requests per day, "
+                                    "reduced latency by 35% and led a team of 6 engineers. " * 3}
+                    for i in range(experiences)],
+        projects=[{"name": f"Project {i}", "description": "Designed an open-source toolkit used by 500+ teams."}
+                  for i in range(max(1, experiences // 5))],
+    )
+    return resume.model_dump()
+
+
+def measure(render, repeats: int) -> dict:
+    """Median wall time, peak traced memory and output size of a render callable"""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        data = render()
+        times.append(time.perf_counter() - started)
+
+    # Measure memory in a separate run so tracing overhead does not skew timings
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": statistics.median(times), "peak_kib": peak / 1024, "bytes": len(data)}
+
+
+def run_suite(repeats: int) -> list:
+    results = []
+    generator = ResumeGenerator()
+    for experiences in EXPERIENCE_COUNTS:
+        resume = synthetic_resume(experiences)
+        for template in TEMPLATES:
+            renderers = {
+                "docx": lambda: generator.render_docx(resume, template_style=template),
+                "pdf": lambda: generator.render_pdf(resume, template_style=template),
+            }
+            for fmt, render in renderers.items():
+                record = {"template": template, "format": fmt, "experiences": experiences,
+                          "skills": len(resume["skills"])}
+                record.update(measure(render, repeats))
+                results.append(record)
+                print(f"{template:<13}{fmt:<6}{experiences:>4} jobs  {record['seconds'] * 1000:9.2f} ms"
+                      f"  {record['peak_kib']:10.1f} KiB peak  {record['bytes']:>9} bytes")
+    return results
+
+
+def compare(results: list, baseline_path: str, tolerance: float, min_delta: float) -> int:
+    """Print regressions against a baseline file and return how many were found"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["template"], r["format"], r["experiences"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for record in results:
+        previous = baseline.get((record["template"], record["format"], record["experiences"]))
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_kib", "bytes"):
+            limit = previous[metric] * (1 + tolerance)
+            # Ignore tiny absolute changes in timings, which are mostly noise
+            if metric == "seconds" and record[metric] - previous[metric] < min_delta:
+                continue
+            if record[metric] > limit:
+                regressions += 1
+                print(f"REGRESSION {record['template']}/{record['format']}/{record['experiences']} jobs: "
+                      f"{metric} {previous[metric]:.4g} -> {record[metric]:.4g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results to this JSON baseline file")
+    parser.add_argument("--compare", help="Compare against this JSON baseline file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown or growth")
+    parser.add_argument("--min-delta", type=float, default=0.002, help="Ignore timing changes below this many seconds")
+    args = parser.parse_args()
+
+    results = run_suite(args.repeats)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance, args.min_delta)
+        print(f"{regressions} regression(s) against {args.compare}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark cold start of the Streamlit app, the HTTP API and ResumeAgent.
+
+Every measurement runs in a fresh interpreter. Import times are the
+cumulative figures reported by ``python -X importtime``. The app is timed in
+two parts, as ``streamlit run`` pays them: server boot (importing Streamlit
+and discovering installed components, once per server) and then app.py's
+first page, one AppTest run in the booted interpreter. Each measurement is checked against
+a budget, and so is the rule that heavy dependencies (the Groq client,
+LangChain, ReportLab, pypdf, python-docx) are only imported on first use.
+No network access or API key is needed.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeats 5 --scale 1.5
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Cumulative import time budgets in seconds, per module
+IMPORT_BUDGETS = {
+    "src.agent.ResumeAgent": 0.5,
+    "api": 1.0,
+}
+# Seconds from a fresh interpreter to a booted Streamlit, from there to a rendered first page
+# of app.py, and to a constructed agent
+STREAMLIT_BOOT_BUDGET = 1.0
+APP_FIRST_PAGE_BUDGET = 0.5
+AGENT_CONSTRUCTION_BUDGET = 1.0
+# Imported only once an LLM call, upload or render actually needs them
+LAZY_MODULES = ("langchain_groq", "groq", "langchain_core", "reportlab", "pypdf", "docx")
+
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_FIRST_PAGE = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from streamlit.components.v2.component_manager import BidiComponentManager
+# A server discovers components once at boot; AppTest would otherwise do it inside the first run
+components = BidiComponentManager()
+components.discover_and_register_components(start_file_watching=False)
+booted = time.perf_counter()
+app = AppTest.from_file("app.py", default_timeout=30)
+app._bidi_component_manager = components
+app.run()
+print(json.dumps({"boot": booted - started, "seconds": time.perf_counter() - booted,
+                  "errors": len(app.exception), "modules": sorted(sys.modules)}))
+"""
+
+AGENT_CONSTRUCTION = """
+import json, time
+from src.agent.ResumeAgent import ResumeAgent
+from src.tools.cache_service import ResultCache
+started = time.perf_counter()
+ResumeAgent(cache=ResultCache(":memory:"), parse_cache=ResultCache(":memory:"))
+print(json.dumps({"seconds": time.perf_counter() - started}))
+"""
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=ROOT, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "unused"))
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def import_profile(module: str) -> dict:
+    """Cumulative import time of a module, the slowest imports under it and every module it loaded"""
+    entries = []
+    for line in _python("-X", "importtime", "-c", f"import {module}").stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            entries.append((match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6))
+    # The requested module is reported last, after everything it imported
+    total = next(cumulative for name, _, cumulative in reversed(entries) if name == module)
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:5]
+    return {"seconds": total, "slowest": [(name, own) for name, own, _ in slowest],
+            "modules": [name for name, _, _ in entries]}
+
+
+def _eager(modules) -> list:
+    """Lazy dependencies that were nonetheless imported"""
+    return sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+
+
+def run_suite(repeats: int, scale: float) -> int:
+    """Print every measurement and return how many budgets were exceeded"""
+    failures = 0
+
+    def check(label: str, seconds: float, budget: float, eager: list) -> None:
+        nonlocal failures
+        over = seconds > budget * scale
+        failures += over + bool(eager)
+        print(f"{label:<28}{seconds * 1000:9.1f} ms  budget {budget * scale * 1000:7.0f} ms"
+              f"  {'OVER BUDGET' if over else 'ok'}")
+        if eager:
+            print(f"  EAGER IMPORTS {', '.join(eager)}")
+
+    for module, budget in IMPORT_BUDGETS.items():
+        profiles = [import_profile(module) for _ in range(repeats)]
+        seconds = statistics.median(profile["seconds"] for profile in profiles)
+        check(f"import {module}", seconds, budget, _eager(profiles[-1]["modules"]))
+        if seconds > budget * scale:
+            for name, own in profiles[-1]["slowest"]:
+                print(f"  {name:<40}{own * 1000:9.1f} ms self")
+
+    runs = [json.loads(_python("-c", APP_FIRST_PAGE).stdout.splitlines()[-1]) for _ in range(repeats)]
+    if any(run["errors"] for run in runs):
+        failures += 1
+        print("app.py raised while rendering its first page")
+    check("streamlit server boot", statistics.median(run["boot"] for run in runs), STREAMLIT_BOOT_BUDGET, [])
+    check("app.py first page", statistics.median(run["seconds"] for run in runs), APP_FIRST_PAGE_BUDGET,
+          _eager(runs[-1]["modules"]))
+
+    runs = [json.loads(_python("-c", AGENT_CONSTRUCTION).stdout.splitlines()[-1]) for _ in range(repeats)]
+    check("ResumeAgent() construction", statistics.median(run["seconds"] for run in runs),
+          AGENT_CONSTRUCTION_BUDGET, [])
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per measurement (median is used)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. on slow CI machines")
+    args = parser.parse_args()
+
+    failures = run_suite(args.repeats, args.scale)
+    print(f"{failures} startup budget violation(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
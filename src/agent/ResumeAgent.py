@@ -1,28 +1,100 @@
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from typing import Dict, Any, List
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Awaitable, Callable, Optional
+import asyncio
+import contextvars
+import time
 
 from src.parsers.parser import ResumeParser
 from src.tools.ats_service import ATSScorer
-from src.tools.enhance_service import Enhancer
-from src.tools.render_service import ResumeGenerator
+from src.tools.enhance_service import CHUNKED_MIN_CHARS, Enhancer
+from src.tools.render_service import TEMPLATES, ResumeGenerator
 from src.tools.extraction_service import ResumeExtractor
+from src.tools.cache_service import ResultCache
+from src.tools.llm_gateway import LLMGateway, LazyChatModel, get_gateway, is_bad_request
+from src.tools.session_service import SessionStore
+from src.tools.tracing_service import get_tracer, output_size
+from pydantic_objects import EnhancedResume
+
+
+# Progress callback of the pipeline run in the current context, called as
+# on_stage(stage, status, seconds) with status "started", "finished" or "failed"
+_stage_listener: ContextVar[Optional[Callable[[str, str, Optional[float]], None]]] = ContextVar(
+    "stage_listener", default=None
+)
+
+
+@contextmanager
+def _stage_timer(timings: Dict[str, float], stage: str):
+    """Record the wall time of a pipeline stage in seconds and trace it as a span"""
+    listener = _stage_listener.get()
+    if listener is not None:
+        listener(stage, 'started', None)
+    start = time.perf_counter()
+    status = 'failed'
+    try:
+        with get_tracer().span(stage) as span:
+            yield span
+        status = 'finished'
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 4)
+        if listener is not None:
+            listener(stage, status, timings[stage])
+
+
+async def _timed(timings: Dict[str, float], stage: str, awaitable: Awaitable) -> Any:
+    """Await a pipeline stage while recording its wall time and output size"""
+    with _stage_timer(timings, stage) as span:
+        result = await awaitable
+        _record_size(span, result)
+        return result
+
+
+def _offload(executor: Optional[Executor], fn: Callable[..., Any], *args: Any) -> Awaitable:
+    """Run a CPU-bound stage on executor, or on a thread when there is none"""
+    if executor is None:
+        return asyncio.to_thread(fn, *args)
+    return asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def _record_size(span, result: Any) -> None:
+    size = output_size(result)
+    if size is not None:
+        span.set('output.bytes', size)
 
 
 class ResumeAgent:
     """Agent orchestrating resume parsing, enhancement, and generation using Groq LLM"""
 
-    def __init__(self):
-        self.parser = ResumeParser()
+    # Chat model for the assistant prompt, built on first use
+    llm = LazyChatModel()
+
+    def __init__(self, cache: ResultCache = None, gateway: LLMGateway = None, single_call: bool = False,
+                 sessions: SessionStore = None, parse_cache: ResultCache = None, candidates: int = 1):
+        # Parsed upload text is keyed by content hash, separately from LLM results
+        self.parser = ResumeParser(cache=parse_cache if parse_cache is not None else ResultCache(
+            ".cache/parsed_text.sqlite", max_entries=500, max_bytes=50 * 1024 * 1024
+        ))
+        # Enhance and extract in one structured LLM call instead of two
+        self.single_call = single_call
+        # Enhancements sampled in parallel per resume, keeping the best ATS score
+        self.candidates = candidates
+        # Every LLM call in the pipeline shares one set of rate limits
+        self.gateway = gateway or get_gateway()
         self.ats_scorer = ATSScorer()
-        self.enhancer = Enhancer()
+        # Enhancement and extraction results are shared across uploads so that
+        # template switches and repeat uploads skip the LLM entirely
+        self.cache = cache if cache is not None else ResultCache()
+        self.enhancer = Enhancer(cache=self.cache, gateway=self.gateway)
         self.generator = ResumeGenerator()
+        # Structured resumes per session, so template switches only re-render
+        self.sessions = sessions if sessions is not None else SessionStore()
 
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0.3
-        )
+        self.model_name = "llama-3.3-70b-versatile"
+        self.temperature = 0.3
 
+        from langchain_core.prompts import ChatPromptTemplate
         self.prompt = ChatPromptTemplate.from_template("""
         You are a professional Resume Assistant using Groq LLM.
         You help users:
@@ -36,64 +108,321 @@ class ResumeAgent:
         User input: {input}
         """)
 
-    def process_resume(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def process_resume(self, input_data: Dict[str, Any],
+                       on_stage: Optional[Callable[[str, str, Optional[float]], None]] = None) -> Dict[str, Any]:
         """Full resume processing pipeline"""
+        if on_stage is not None:
+            context = contextvars.copy_context()
+            context.run(_stage_listener.set, on_stage)
+            return context.run(self.process_resume, input_data)
+
         results = {}
-        
+        timings = {}
+
         # Get template style from input (default to professional)
         template_style = input_data.get('template_style', 'professional')
-        
-        # Parse resume
-        if 'file_path' in input_data:
-            file_path = input_data['file_path']
-            if file_path.endswith('.pdf'):
-                resume_text = self.parser.parse_pdf(file_path)
-            elif file_path.endswith('.docx'):
-                resume_text = self.parser.parse_docx(file_path)
+        job_description = input_data.get('job_description', '')
+
+        with _stage_timer(timings, 'total'):
+            # Parse resume
+            with _stage_timer(timings, 'parse') as span:
+                parsed = self._parse_input(input_data)
+                _record_size(span, parsed)
+            resume_text = parsed['text']
+            results['original_text'] = resume_text
+            # Set when the parser's page or character budget cut the upload short
+            results['truncated'] = parsed.get('truncated', False)
+
+            # Score original
+            with _stage_timer(timings, 'initial_score'):
+                results['initial_score'] = self.ats_scorer.calculate_score(resume_text, job_description)
+
+            # Enhance, in one structured call when enabled
+            structured_data = None
+            if input_data.get('single_call', self.single_call):
+                with _stage_timer(timings, 'enhance_structured') as span:
+                    structured_data = self._try_enhance_structured(resume_text)
+                    _record_size(span, structured_data)
+            results['single_call'] = structured_data is not None
+            if structured_data is not None:
+                enhanced_text = self.structured_to_text(structured_data)
             else:
-                raise ValueError("Unsupported file type")
-        else:
-            resume_text = self.parser.parse_manual_input(input_data)
-        
-        results['original_text'] = resume_text
-
-        # Score original
-        results['initial_score'] = self.ats_scorer.calculate_score(resume_text)
-
-        # Enhance
-        enhanced_text = self.enhancer.enhance_with_groq(resume_text)
-        results['enhanced_text'] = enhanced_text
-
-        # Score enhanced
-        results['final_score'] = self.ats_scorer.calculate_score(enhanced_text)
-
-        # Extract structured data for generation
-        extractor = ResumeExtractor(enhanced_text)
-        structured_data = extractor.extraction()
-        resume_dict = structured_data.model_dump()
-
-        # Generate files with selected template style
-        docx_path = self.generator.generate_docx(
-            resume_dict, 
-            template_style=template_style,
-            filename=f"resume_{template_style}.docx"
-        )
-        pdf_path = self.generator.generate_pdf(
-            resume_dict, 
-            template_style=template_style,
-            filename=f"resume_{template_style}.pdf"
-        )
-        
-        results['docx_path'] = docx_path
-        results['pdf_path'] = pdf_path
+                best_of = self._best_of_options(input_data, job_description)
+                with _stage_timer(timings, 'enhance') as span:
+                    if input_data.get('incremental'):
+                        enhanced_text = self.enhancer.enhance_incremental(resume_text)
+                    elif best_of is not None:
+                        enhanced_text = self.enhancer.enhance_best_of(resume_text, **best_of)
+                    elif self._use_chunked(input_data, resume_text):
+                        enhanced_text = self.enhancer.enhance_chunked(resume_text)
+                    else:
+                        enhanced_text = self.enhancer.enhance_with_groq(resume_text)
+                    _record_size(span, enhanced_text)
+            results['enhanced_text'] = enhanced_text
+
+            # Score enhanced
+            with _stage_timer(timings, 'final_score'):
+                results['final_score'] = self.ats_scorer.calculate_score(enhanced_text, job_description)
+
+            # Extract structured data for generation
+            if structured_data is None:
+                with _stage_timer(timings, 'extract') as span:
+                    extractor = ResumeExtractor(enhanced_text, cache=self.cache, gateway=self.gateway,
+                                                sections=self._section_hints(parsed))
+                    structured_data = extractor.extraction()
+                    _record_size(span, structured_data)
+            resume_dict = structured_data.model_dump()
+
+            # Render DOCX and PDF in memory from one document tree
+            with _stage_timer(timings, 'render') as span:
+                results['docx_bytes'], results['pdf_bytes'] = self.generator.render(resume_dict, template_style)
+                _record_size(span, (results['docx_bytes'], results['pdf_bytes']))
+
+        if input_data.get('save_files'):
+            results.update(self._save_files(results, template_style))
+        if input_data.get('session_id') is not None:
+            self._remember(input_data['session_id'], structured_data, template_style, results)
         results['template_style'] = template_style
+        results['timings'] = timings
 
         return results
 
+    async def aprocess_resume(self, input_data: Dict[str, Any],
+                              on_token: Optional[Callable[[str], None]] = None,
+                              on_stage: Optional[Callable[[str, str, Optional[float]], None]] = None,
+                              executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """Concurrent resume processing pipeline.
+
+        Runs the initial ATS score alongside enhancement, the final score
+        alongside extraction, and the DOCX and PDF renders side by side.
+        Per-stage wall times are returned under ``timings``. When ``on_token``
+        is given the enhancement is streamed and each chunk is passed to it
+        as it arrives. In single-call mode enhancement and extraction share one
+        structured LLM call, falling back to two calls if validation fails.
+        Renders are returned as ``docx_bytes`` and ``pdf_bytes``; files are
+        only written when ``save_files`` is set in input_data. With a
+        ``session_id`` the structured resume is kept for ``rerender``. With
+        ``incremental`` only sections changed since an earlier enhancement
+        are sent to the LLM, e.g. for re-enhancing edited ``resume_text``.
+        With ``candidates`` above 1 that many enhancements are sampled in
+        parallel and the best by ATS score is kept, stopping early at
+        ``target_score`` or after ``enhance_deadline`` seconds. Resumes of
+        ``CHUNKED_MIN_CHARS`` or more are enhanced as concurrent section
+        chunks unless ``chunked`` is set to False (or True to force it); with
+        ``on_token`` each chunk is passed on as soon as it is ready.
+        ``on_stage(stage, status, seconds)`` reports progress as each stage
+        starts, finishes or fails. Parsing files, scoring, layout and rendering
+        run on ``executor`` when one is given, such as a batch's process pool;
+        files are then parsed in a single process each.
+        """
+        if on_stage is not None:
+            # Run in a copied context so the listener only sees this run's stages,
+            # including those of the tasks it spawns
+            context = contextvars.copy_context()
+            context.run(_stage_listener.set, on_stage)
+            return await context.run(asyncio.ensure_future, self.aprocess_resume(input_data, on_token, executor=executor))
+
+        results = {}
+        timings = {}
+        template_style = input_data.get('template_style', 'professional')
+        job_description = input_data.get('job_description', '')
+
+        with _stage_timer(timings, 'total'):
+            if executor is not None and 'file_path' in input_data:
+                parse = _offload(executor, ResumeParser.parse_file, input_data['file_path'], 1)
+            else:
+                parse = asyncio.to_thread(self._parse_input, input_data)
+            parsed = await _timed(timings, 'parse', parse)
+            resume_text = parsed['text']
+            results['original_text'] = resume_text
+            # Set when the parser's page or character budget cut the upload short
+            results['truncated'] = parsed.get('truncated', False)
+
+            # Score original while the enhancement call is in flight
+            initial_score = asyncio.ensure_future(_timed(
+                timings, 'initial_score', _offload(executor, self.ats_scorer.calculate_score, resume_text, job_description)
+            ))
+
+            try:
+                # Streaming needs plain text, so single-call mode only applies without on_token
+                structured_data = None
+                if input_data.get('single_call', self.single_call) and on_token is None:
+                    structured_data = await _timed(timings, 'enhance_structured', self._atry_enhance_structured(resume_text))
+                results['single_call'] = structured_data is not None
+
+                if structured_data is not None:
+                    enhanced_text = self.structured_to_text(structured_data)
+                    results['final_score'] = await _timed(
+                        timings, 'final_score',
+                        _offload(executor, self.ats_scorer.calculate_score, enhanced_text, job_description)
+                    )
+                else:
+                    enhanced_text = await _timed(timings, 'enhance', self._aenhance(
+                        resume_text, on_token, input_data.get('incremental', False),
+                        self._best_of_options(input_data, job_description), self._use_chunked(input_data, resume_text)
+                    ))
+
+                    # Score enhanced while structured extraction is in flight
+                    extractor = ResumeExtractor(enhanced_text, cache=self.cache, gateway=self.gateway,
+                                                sections=self._section_hints(parsed))
+                    results['final_score'], structured_data = await asyncio.gather(
+                        _timed(timings, 'final_score',
+                               _offload(executor, self.ats_scorer.calculate_score, enhanced_text, job_description)),
+                        _timed(timings, 'extract', extractor.aextraction())
+                    )
+                results['initial_score'] = await initial_score
+            finally:
+                # Does nothing once scored; otherwise enhancement failed and the score is not needed
+                initial_score.cancel()
+            results['enhanced_text'] = enhanced_text
+            resume_dict = structured_data.model_dump()
+
+            # Lay the resume out once, then render DOCX and PDF side by side, in memory
+            blocks = await _timed(timings, 'layout', _offload(executor, self.generator.layout, resume_dict, template_style))
+            results['docx_bytes'], results['pdf_bytes'] = await asyncio.gather(
+                _timed(timings, 'render_docx', _offload(executor, self.generator.docx_from_layout, blocks, template_style)),
+                _timed(timings, 'render_pdf', _offload(executor, self.generator.pdf_from_layout, blocks, template_style))
+            )
+
+        if input_data.get('save_files'):
+            results.update(self._save_files(results, template_style))
+        if input_data.get('session_id') is not None:
+            self._remember(input_data['session_id'], structured_data, template_style, results)
+        results['template_style'] = template_style
+        results['timings'] = timings
+
+        return results
+
+    def rerender(self, session_id: str, template_style: str) -> Dict[str, Any]:
+        """Render a session's cached structured resume in another template without any LLM call.
+
+        Raises KeyError when the session is unknown or has expired.
+        """
+        timings = {}
+        with _stage_timer(timings, 'render') as span:
+            docx_bytes, pdf_bytes = self._session_render(session_id, template_style).result()
+            _record_size(span, (docx_bytes, pdf_bytes))
+        return {
+            'docx_bytes': docx_bytes,
+            'pdf_bytes': pdf_bytes,
+            'template_style': template_style,
+            'timings': timings
+        }
+
+    def prerender(self, session_id: str) -> None:
+        """Render every template for a session in the background"""
+        for template_style in TEMPLATES:
+            self._session_render(session_id, template_style)
+
+    def _session_render(self, session_id: str, template_style: str) -> Future:
+        return self.sessions.render(
+            session_id, template_style,
+            lambda structured_data: self.generator.render(structured_data.model_dump(), template_style)
+        )
+
+    def _remember(self, session_id: str, structured_data: EnhancedResume, template_style: str,
+                  results: Dict[str, Any]) -> None:
+        """Keep the structured resume and its render, then pre-render the other templates"""
+        self.sessions.put(session_id, structured_data)
+        self.sessions.set_render(session_id, template_style, (results['docx_bytes'], results['pdf_bytes']))
+        self.prerender(session_id)
+
+    def structured_to_text(self, structured_data: EnhancedResume) -> str:
+        """Derive the plain enhanced resume text locally from structured data"""
+        return self.parser.parse_manual_input(structured_data.model_dump())
+
+    def _try_enhance_structured(self, resume_text: str) -> Optional[EnhancedResume]:
+        """Single-call enhancement, or None when the output fails validation or the provider rejects it"""
+        try:
+            return self.enhancer.enhance_structured(resume_text)
+        except ValueError:
+            return None
+        except Exception as e:
+            # Groq answers 400 "tool_use_failed" when the model's output does not fit the schema tool
+            if not is_bad_request(e):
+                raise
+            return None
+
+    async def _atry_enhance_structured(self, resume_text: str) -> Optional[EnhancedResume]:
+        try:
+            return await self.enhancer.aenhance_structured(resume_text)
+        except ValueError:
+            return None
+        except Exception as e:
+            if not is_bad_request(e):
+                raise
+            return None
+
+    def _best_of_options(self, input_data: Dict[str, Any], job_description: str) -> Optional[Dict[str, Any]]:
+        """Arguments for best-of-N enhancement, or None for a single sample"""
+        candidates = input_data.get('candidates', self.candidates)
+        if candidates <= 1:
+            return None
+        return {
+            'candidates': candidates,
+            'job_description': job_description,
+            'target_score': input_data.get('target_score'),
+            'deadline': input_data.get('enhance_deadline')
+        }
+
+    @staticmethod
+    def _use_chunked(input_data: Dict[str, Any], resume_text: str) -> bool:
+        """Whether to enhance in section chunks: as requested, or by default for long resumes"""
+        chunked = input_data.get('chunked')
+        return len(resume_text) >= CHUNKED_MIN_CHARS if chunked is None else chunked
+
+    async def _aenhance(self, resume_text: str, on_token: Optional[Callable[[str], None]],
+                        incremental: bool = False, best_of: Optional[Dict[str, Any]] = None,
+                        chunked: bool = False) -> str:
+        # Incremental and best-of-N results are only known once complete, so they are passed on whole
+        if incremental or best_of is not None:
+            if incremental:
+                enhanced = await self.enhancer.aenhance_incremental(resume_text)
+            else:
+                enhanced = await self.enhancer.aenhance_best_of(resume_text, **best_of)
+            if on_token is not None:
+                on_token(enhanced)
+            return enhanced
+        if chunked:
+            # Each chunk is passed on as soon as it and the chunks before it are done
+            return await self.enhancer.aenhance_chunked(resume_text, on_chunk=on_token)
+        if on_token is None:
+            return await self.enhancer.aenhance_with_groq(resume_text)
+        chunks = []
+        async for chunk in self.enhancer.astream_enhance(resume_text):
+            chunks.append(chunk)
+            on_token(chunk)
+        return "".join(chunks).strip()
+
+    def _parse_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract resume text, and section spans for uploads, from a file or manual input"""
+        if 'resume_text' in input_data:
+            # Plain text as-is, such as an edited enhanced resume
+            return {'text': input_data['resume_text'], 'sections': None}
+        if 'file_bytes' in input_data:
+            return self.parser.parse_upload(input_data['file_bytes'], input_data.get('filename', ''))
+        if 'file_path' in input_data:
+            return self.parser.parse_file(input_data['file_path'])
+        return {'text': self.parser.parse_manual_input(input_data), 'sections': None}
+
+    @staticmethod
+    def _section_hints(parsed: Dict[str, Any]) -> Optional[List[str]]:
+        """Names of the sections found in the original resume, if it was parsed from a file"""
+        if parsed.get('sections') is None:
+            return None
+        return [section['name'] for section in parsed['sections']]
+
+    def _save_files(self, results: Dict[str, Any], template_style: str) -> Dict[str, str]:
+        """Optional sink that also writes the rendered bytes to the output directory"""
+        return {
+            'docx_path': self.generator.save(results['docx_bytes'], f"resume_{template_style}.docx"),
+            'pdf_path': self.generator.save(results['pdf_bytes'], f"resume_{template_style}.pdf")
+        }
+
     def chat(self, message: str, chat_history: List = None) -> str:
         """Chat-like interaction"""
         if chat_history is None:
             chat_history = []
         formatted_prompt = self.prompt.format(input=message)
-        response = self.llm.invoke(formatted_prompt)
+        response = self.gateway.invoke(self.llm, formatted_prompt)
         return response.content.strip()
\ No newline at end of file
@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import hashlib
+import json
+import os
+
+from src.agent.ResumeAgent import ResumeAgent
+from src.tools.llm_gateway import call_permits
+from src.tools.render_service import ResumeGenerator
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+
+class BatchProcessor:
+    """Runs many resumes through the ResumeAgent pipeline with bounded concurrency.
+
+    Each resume goes through ResumeAgent.aprocess_resume with parsing, scoring
+    and rendering on a process pool, LLM calls share one async semaphore, and
+    each finished resume is appended to a JSONL file that doubles as the
+    checkpoint for resuming an interrupted run.
+    """
+
+    def __init__(self, agent: Optional[ResumeAgent] = None, output_path: str = "batch_results.jsonl",
+                 output_dir: str = "output/batch", template_style: str = "professional",
+                 max_workers: Optional[int] = None, llm_concurrency: int = 4,
+                 job_description: str = "", single_call: bool = False, candidates: int = 1,
+                 target_score: Optional[int] = None):
+        self.agent = agent or ResumeAgent()
+        self.output_path = output_path
+        self.output_dir = output_dir
+        self.template_style = template_style
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.llm_concurrency = llm_concurrency
+        self.job_description = job_description
+        self.single_call = single_call
+        # Best-of-N enhancement: samples per resume and the ATS score that ends sampling early
+        self.candidates = candidates
+        self.target_score = target_score
+
+    @staticmethod
+    def discover(source: str) -> List[Dict[str, Any]]:
+        """List the resumes in a directory or manifest file.
+
+        A manifest is either JSONL with one ``{"file_path": ..., "template_style": ...}``
+        object per line, or plain text with one file path per line.
+        """
+        path = Path(source)
+        if path.is_dir():
+            files = sorted(p for p in path.rglob('*') if p.suffix.lower() in SUPPORTED_EXTENSIONS)
+            return [{'file_path': str(p)} for p in files]
+
+        items = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line) if line.startswith('{') else {'file_path': line}
+                # Manifest entries are relative to the manifest itself
+                if not os.path.isabs(item['file_path']):
+                    item['file_path'] = str(path.parent / item['file_path'])
+                items.append(item)
+        return items
+
+    def run(self, source: str) -> Dict[str, int]:
+        """Process every resume in source, skipping those already completed"""
+        return asyncio.run(self.arun(source))
+
+    async def arun(self, source: str) -> Dict[str, int]:
+        items = self.discover(source)
+        completed = self._load_checkpoint()
+        pending = [item for item in items if item['file_path'] not in completed]
+        summary = {'total': len(items), 'skipped': len(items) - len(pending), 'succeeded': 0, 'failed': 0}
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+        write_lock = asyncio.Lock()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Binary mode, so the last byte can be checked by offset; writes still always append
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool, open(self.output_path, 'ab+') as out:
+            # Terminate a line left truncated by a crash before appending to it
+            if out.seek(0, os.SEEK_END) > 0:
+                out.seek(-1, os.SEEK_END)
+                if out.read(1) != b'\n':
+                    out.write(b'\n')
+
+            async def worker():
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    record = await self._process_one(item, pool)
+                    summary['succeeded' if record['status'] == 'ok' else 'failed'] += 1
+                    async with write_lock:
+                        out.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                        out.flush()
+                        os.fsync(out.fileno())
+
+            # Keep enough resumes in flight to saturate both the pool and the LLM semaphore
+            in_flight = min(len(pending), self.max_workers + self.llm_concurrency)
+            # Permits are taken per LLM call, so chunked and best-of-N enhancement stay within the limit
+            with call_permits(semaphore):
+                await asyncio.gather(*(worker() for _ in range(in_flight)))
+
+        return summary
+
+    async def _process_one(self, item: Dict[str, Any], pool: ProcessPoolExecutor) -> Dict[str, Any]:
+        file_path = item['file_path']
+        template_style = item.get('template_style', self.template_style)
+        record = {'file_path': file_path, 'template_style': template_style}
+
+        try:
+            results = await self.agent.aprocess_resume({
+                'file_path': file_path,
+                'template_style': template_style,
+                'job_description': self.job_description,
+                'single_call': self.single_call,
+                'candidates': self.candidates,
+                'target_score': self.target_score,
+            }, executor=pool)
+            stem = f"{Path(file_path).stem}_{hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:8]}"
+            generator = ResumeGenerator(self.output_dir)
+            docx_path, pdf_path = await asyncio.gather(
+                asyncio.to_thread(generator.save, results['docx_bytes'], f"{stem}_{template_style}.docx"),
+                asyncio.to_thread(generator.save, results['pdf_bytes'], f"{stem}_{template_style}.pdf")
+            )
+
+            record.update({
+                'status': 'ok',
+                'initial_score': results['initial_score']['score'],
+                'final_score': results['final_score']['score'],
+                'docx_path': docx_path,
+                'pdf_path': pdf_path,
+                'timings': results['timings']
+            })
+        except Exception as e:
+            record.update({'status': 'error', 'error': str(e)})
+
+        return record
+
+    def _load_checkpoint(self) -> Set[str]:
+        """Collect the resumes already processed successfully by a previous run"""
+        completed = set()
+        if not os.path.exists(self.output_path):
+            return completed
+        with open(self.output_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a truncated last line behind
+                    continue
+                if record.get('status') == 'ok':
+                    completed.add(record['file_path'])
+        return completed
@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import time
+import uuid
+
+from src.agent.ResumeAgent import ResumeAgent
+
+TERMINAL_STATUSES = ('done', 'failed')
+
+
+class Job:
+    """One queued pipeline run, its per-stage progress and, once done, its renders"""
+
+    def __init__(self, input_data: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.input_data = input_data
+        self.status = 'queued'
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Every event so far, replayed to late subscribers
+        self.events: List[Dict[str, Any]] = []
+        self._subscribers: List[asyncio.Event] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serialisable view of the job without the rendered bytes"""
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'template_style': self.input_data.get('template_style', 'professional'),
+            'stages': self.stages,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+        if self.error is not None:
+            data['error'] = self.error
+        if self.result is not None:
+            for key in ('initial_score', 'final_score', 'enhanced_text', 'timings'):
+                data[key] = self.result.get(key)
+        return data
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self.events.append(event)
+        for changed in self._subscribers:
+            changed.set()
+
+
+class JobQueue:
+    """Bounded queue of resume jobs drained by a pool of async workers.
+
+    Requests only enqueue, so slow LLM work never runs on the request path.
+    Progress is published per stage for polling or server-sent events, and
+    finished jobs keep their DOCX/PDF bytes until evicted, oldest first, past
+    max_jobs or ttl_seconds after finishing.
+    """
+
+    def __init__(self, agent: Optional[ResumeAgent] = None, workers: int = 2, max_queued: int = 100,
+                 max_jobs: int = 1000, ttl_seconds: Optional[float] = 3600):
+        self.agent = agent or ResumeAgent()
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, input_data: Dict[str, Any]) -> Job:
+        """Queue a pipeline run; raises asyncio.QueueFull when the backlog is at capacity"""
+        job = Job(input_data)
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    async def events(self, job: Job) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's events so far, then new ones until it finishes"""
+        changed = asyncio.Event()
+        job._subscribers.append(changed)
+        try:
+            seen = 0
+            while True:
+                while seen < len(job.events):
+                    seen += 1
+                    yield job.events[seen - 1]
+                if job.finished:
+                    return
+                await changed.wait()
+                changed.clear()
+        finally:
+            job._subscribers.remove(changed)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = 'running'
+        job.publish({'event': 'status', 'status': 'running'})
+
+        def on_stage(stage: str, status: str, seconds: Optional[float]) -> None:
+            job.stages[stage] = {'status': status, 'seconds': seconds}
+            job.publish({'event': 'stage', 'stage': stage, 'status': status, 'seconds': seconds})
+
+        try:
+            job.result = await self.agent.aprocess_resume(job.input_data, on_stage=on_stage)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        job.finished_at = time.time()
+        # Uploaded bytes are no longer needed once the run is over
+        job.input_data = {key: value for key, value in job.input_data.items() if key != 'file_bytes'}
+        event = {'event': 'status', 'status': job.status}
+        if job.error is not None:
+            event['error'] = job.error
+        job.publish(event)
+
+    def _evict(self) -> None:
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        if self.ttl_seconds is not None:
+            for job in finished:
+                if now - job.finished_at > self.ttl_seconds:
+                    del self._jobs[job.id]
+        # Queued and running jobs are never evicted
+        for job in finished:
+            if len(self._jobs) <= self.max_jobs:
+                break
+            self._jobs.pop(job.id, None)
@@ -1,25 +1,357 @@
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
-from typing import Dict, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+from lxml import etree
+import hashlib
 import json
+import os
+import re
+import zipfile
+
+from src.tools.cache_service import ResultCache
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+# Suggested opt-in budgets; text past them is usually publication lists or appendices
+PDF_MAX_PAGES = 40
+PDF_MAX_CHARS = 60000
+# Below this many pages a process pool costs more than it saves
+PARALLEL_MIN_PAGES = 16
+PAGES_PER_TASK = 4
+
+# Bump when extraction changes so cached text from older parsers is ignored
+PARSER_VERSION = 4
+
+PdfSource = Union[str, bytes]
+
+# Heading keywords per resume section, checked in this order so that e.g.
+# "Research Experience" is experience and "Academic Projects" is projects
+SECTION_KEYWORDS = {
+    'experience': ('experience', 'employment', 'work history', 'career history'),
+    'projects': ('project', 'research', 'publication', 'portfolio'),
+    'skills': ('skill', 'competenc', 'technolog', 'tools'),
+    'education': ('education', 'academic', 'qualification', 'certification'),
+    'summary': ('summary', 'profile', 'objective', 'about me'),
+    'personal_info': ('personal information', 'personal details', 'contact'),
+}
+HEADING_STYLE_PATTERN = re.compile(r'^(heading|title)', re.IGNORECASE)
+PARAGRAPH_BREAK_PATTERN = re.compile(r'\n\s*\n')
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_HEADER_PATTERN = re.compile(r'^word/header\d*\.xml$')
+DOCX_FOOTER_PATTERN = re.compile(r'^word/footer\d*\.xml$')
+# The only WordprocessingML elements the reader needs events for
+DOCX_TAGS = [W + tag for tag in ('p', 'pStyle', 't', 'tab', 'br', 'cr', 'tr', 'tc')]
+
+
+def section_for_heading(line: str) -> Optional[str]:
+    """Resume section a heading line introduces, if it looks like one"""
+    text = line.strip().strip(':').lower()
+    if not text or len(text) > 40 or len(text.split()) > 5:
+        return None
+    for section, keywords in SECTION_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return section
+    return None
+
+
+def find_sections(lines: Iterable[Tuple[str, str]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Join (line, paragraph style) pairs into text and locate section headings.
+
+    A line counts as a heading when it has a heading style, is upper case or
+    ends with a colon, and names a known section. Sections are returned as
+    ``{"name", "heading", "start", "end"}`` character spans of the text.
+    """
+    parts = []
+    sections = []
+    offset = 0
+    for line, style in lines:
+        stripped = line.strip()
+        if stripped and (HEADING_STYLE_PATTERN.match(style) or stripped.isupper() or stripped.endswith(':')):
+            name = section_for_heading(stripped)
+            if name is not None:
+                if sections:
+                    sections[-1]['end'] = offset
+                sections.append({'name': name, 'heading': stripped, 'start': offset, 'end': None})
+        parts.append(line)
+        offset += len(line) + 1
+    text = "\n".join(parts)
+    if sections:
+        sections[-1]['end'] = len(text)
+    return text, sections
+
+
+def text_sections(text: str) -> List[Dict[str, Any]]:
+    """Section spans of plain text such as PDF output or enhanced resumes"""
+    return find_sections((line, '') for line in text.split("\n"))[1]
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text into the lines before the first heading and one chunk per section"""
+    starts = [section['start'] for section in text_sections(text)]
+    bounds = [0] + starts + [len(text)]
+    return [chunk for chunk in (text[start:end].strip() for start, end in zip(bounds, bounds[1:])) if chunk]
+
+
+def chunk_sections(text: str, max_chars: int) -> List[str]:
+    """Split text at section boundaries into chunks of about ``max_chars`` at most.
+
+    Adjacent short sections share a chunk. A section longer than
+    ``max_chars`` is split between paragraphs, or between lines when a single
+    paragraph is too long.
+    """
+    pieces = []
+    for section in split_sections(text):
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+        for paragraph in PARAGRAPH_BREAK_PATTERN.split(section):
+            pieces.extend(_pack(paragraph.split("\n"), "\n", max_chars) if len(paragraph) > max_chars else [paragraph])
+    return _pack(pieces, "\n\n", max_chars)
+
+
+def _pack(parts: List[str], separator: str, max_chars: int) -> List[str]:
+    """Greedily join consecutive parts while they fit in max_chars"""
+    packed = []
+    for part in parts:
+        if packed and len(packed[-1]) + len(separator) + len(part) <= max_chars:
+            packed[-1] += separator + part
+        else:
+            packed.append(part)
+    return packed
+
+
+def _iter_docx_lines(stream) -> Iterator[Tuple[str, str]]:
+    """Stream (text, paragraph style) pairs from a WordprocessingML part.
+
+    Each paragraph becomes a line and each table row becomes one line with
+    its cells separated by " | ". Finished elements are cleared as they go.
+    """
+    paragraphs = []  # [text parts, style] per open paragraph (text boxes nest)
+    rows = []  # cell texts per open table row
+    cells = []  # paragraph texts per open table cell
+    for event, elem in etree.iterparse(stream, events=('start', 'end'), tag=DOCX_TAGS):
+        tag = elem.tag
+        if event == 'start':
+            if tag == W + 'p':
+                paragraphs.append([[], ''])
+            elif tag == W + 'tr':
+                rows.append([])
+            elif tag == W + 'tc':
+                cells.append([])
+            continue
+
+        if tag == W + 't':
+            if paragraphs:
+                paragraphs[-1][0].append(elem.text or '')
+        elif tag == W + 'tab':
+            if paragraphs:
+                paragraphs[-1][0].append('\t')
+        elif tag in (W + 'br', W + 'cr'):
+            if paragraphs:
+                paragraphs[-1][0].append('\n')
+        elif tag == W + 'pStyle':
+            if paragraphs:
+                paragraphs[-1][1] = elem.get(W + 'val', '')
+        elif tag == W + 'p':
+            parts, style = paragraphs.pop()
+            text = ''.join(parts)
+            if cells:
+                cells[-1].append(text)
+            else:
+                yield text, style
+            elem.clear()
+        elif tag == W + 'tc':
+            rows[-1].append(' '.join(text for text in cells.pop() if text))
+        elif tag == W + 'tr':
+            line = ' | '.join(cell for cell in rows.pop() if cell)
+            if cells:
+                # Nested table: the row belongs to the enclosing cell
+                cells[-1].append(line)
+            else:
+                yield line, ''
+            elem.clear()
+
+
+def read_docx(source: Union[str, bytes]) -> Dict[str, Any]:
+    """Extract DOCX text and section spans in one streaming pass over the package.
+
+    Works on a path or in-memory bytes. Header parts come first and footers
+    last, as contact details often live in the page header.
+    """
+    with zipfile.ZipFile(BytesIO(source) if isinstance(source, bytes) else source) as archive:
+        names = archive.namelist()
+        part_names = (sorted(name for name in names if DOCX_HEADER_PATTERN.match(name)) + ['word/document.xml']
+                      + sorted(name for name in names if DOCX_FOOTER_PATTERN.match(name)))
+
+        def lines():
+            for name in part_names:
+                with archive.open(name) as stream:
+                    yield from _iter_docx_lines(stream)
+
+        text, sections = find_sections(lines())
+    return {'text': text, 'sections': sections}
+
+
+def _pdf_reader(source: PdfSource) -> "PdfReader":
+    # pypdf is only imported once a PDF is actually parsed
+    from pypdf import PdfReader
+    return PdfReader(BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _is_junk(text: str) -> bool:
+    """Pages without a text layer (scans) or with mostly symbols carry nothing useful"""
+    stripped = "".join(text.split())
+    return not stripped or sum(c.isalnum() for c in stripped) < 0.3 * len(stripped)
+
+
+def _extract_pages(source: PdfSource, start: int, stop: int) -> List[str]:
+    """Process-pool worker: extract the text of pages [start, stop)"""
+    reader = _pdf_reader(source)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _iter_parallel(source: PdfSource, page_count: int, workers: int) -> Iterator[str]:
+    """Yield page texts in order while keeping a bounded window of page ranges in flight"""
+    pool = ProcessPoolExecutor(max_workers=workers)
+    ranges = iter(range(0, page_count, PAGES_PER_TASK))
+    pending = deque()
+
+    def submit():
+        start = next(ranges, None)
+        if start is not None:
+            pending.append(pool.submit(_extract_pages, source, start, min(start + PAGES_PER_TASK, page_count)))
+
+    try:
+        for _ in range(workers * 2):
+            submit()
+        while pending:
+            texts = pending.popleft().result()
+            submit()
+            yield from texts
+    finally:
+        # Runs when the consumer stops early, so unstarted ranges are dropped
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def read_pdf(source: PdfSource, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+             workers: Optional[int] = None) -> Tuple[List[str], bool]:
+    """Useful page texts of a PDF within the budgets, and whether any text past them was dropped"""
+    # Read one page and one character past each budget to learn whether anything was cut
+    pages = list(ResumeParser.iter_pdf_pages(
+        source, None if max_pages is None else max_pages + 1, None if max_chars is None else max_chars + 1, workers
+    ))
+    truncated = False
+    if max_pages is not None and len(pages) > max_pages:
+        pages, truncated = pages[:max_pages], True
+    if max_chars is not None and sum(len(page) for page in pages) > max_chars:
+        kept, chars = [], 0
+        for page in pages:
+            if chars + len(page) >= max_chars:
+                kept.append(page[:max_chars - chars])
+                break
+            kept.append(page)
+            chars += len(page)
+        pages, truncated = kept, True
+    return pages, truncated
+
 
 class ResumeParser:
     """Parses resume from PDF, DOCX, or manual input"""
-    
+
+    def __init__(self, cache: Optional[ResultCache] = None, max_pages: Optional[int] = None,
+                 max_chars: Optional[int] = None):
+        # Extracted text keyed by upload content, so repeat uploads skip the parse
+        self.cache = cache
+        # PDFs are parsed in full unless budgets are set, e.g. PDF_MAX_PAGES and PDF_MAX_CHARS
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+
+    def parse_upload(self, data: bytes, filename: str) -> Dict[str, Any]:
+        """Parse an in-memory upload into text, section spans and page metadata, cached by content hash.
+
+        'truncated' is True when a PDF ran past the parser's page or character
+        budget and the text past it was dropped.
+        """
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in ('.pdf', '.docx'):
+            raise ValueError("Unsupported file type")
+
+        key = ResultCache.make_key(
+            "parsed", PARSER_VERSION, extension, self.max_pages, self.max_chars, hashlib.sha256(data).hexdigest()
+        )
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if extension == '.pdf':
+            pages, truncated = read_pdf(data, self.max_pages, self.max_chars)
+            text = "\n".join(pages)
+            parsed = {'text': text, 'sections': text_sections(text), 'page_count': len(pages),
+                      'page_chars': [len(page) for page in pages], 'truncated': truncated}
+        else:
+            parsed = dict(read_docx(data), page_count=None, page_chars=[], truncated=False)
+
+        if self.cache is not None:
+            self.cache.set(key, parsed)
+        return parsed
+
+    @staticmethod
+    def iter_pdf_pages(source: PdfSource, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                       workers: Optional[int] = None) -> Iterator[str]:
+        """Lazily yield the text of each useful PDF page from a path or raw bytes.
+
+        Blank and junk pages are skipped. Large files are spread over a
+        process pool unless workers is 1. Iteration stops once max_pages
+        useful pages or max_chars characters have been yielded, and callers
+        can start consuming text before the rest of the file is parsed.
+        """
+        reader = _pdf_reader(source)
+        page_count = len(reader.pages)
+        workers = workers or os.cpu_count() or 1
+
+        if workers > 1 and page_count >= PARALLEL_MIN_PAGES:
+            pages = _iter_parallel(source, page_count, workers)
+        else:
+            pages = (reader.pages[i].extract_text() or "" for i in range(page_count))
+
+        yielded = chars = 0
+        try:
+            for text in pages:
+                if _is_junk(text):
+                    continue
+                if max_chars is not None and chars + len(text) > max_chars:
+                    text = text[:max_chars - chars]
+                yield text
+                yielded += 1
+                chars += len(text)
+                if (max_pages is not None and yielded >= max_pages) or (max_chars is not None and chars >= max_chars):
+                    return
+        finally:
+            pages.close()
+
     @staticmethod
-    def parse_pdf(file_path: str) -> str:
-        """Extract text from PDF file"""
-        loader = PyPDFLoader(file_path)
-        documents = loader.load() 
-        text = "\n".join([doc.page_content for doc in documents])
-        return text
+    def parse_pdf(file_path: PdfSource, workers: Optional[int] = None) -> str:
+        """Extract the full text from PDF file; use read_pdf for budgets and truncation"""
+        return "\n".join(ResumeParser.iter_pdf_pages(file_path, workers=workers))
     
     @staticmethod
-    def parse_docx(file_path: str) -> str:
+    def parse_file(file_path: str, workers: Optional[int] = None) -> Dict[str, Any]:
+        """Parse a PDF or DOCX file on disk into text and section spans"""
+        if file_path.endswith('.pdf'):
+            text = ResumeParser.parse_pdf(file_path, workers)
+            return {'text': text, 'sections': text_sections(text)}
+        if file_path.endswith('.docx'):
+            return read_docx(file_path)
+        raise ValueError("Unsupported file type")
+
+    @staticmethod
+    def parse_docx(file_path: Union[str, bytes]) -> str:
         """Extract text from DOCX file"""
-        loader = Docx2txtLoader(file_path)
-        documents = loader.load()
-        text = "\n".join([doc.page_content for doc in documents])
-        return text
+        return read_docx(file_path)['text']
     
     @staticmethod
     def parse_manual_input(data: Dict[str, Any]) -> str:
@@ -30,6 +362,10 @@ class ResumeParser:
         if 'personal_info' in data:
             info = data['personal_info']
             sections.append(f"PERSONAL INFORMATION\n{info.get('name', '')}\n{info.get('email', '')}\n{info.get('phone', '')}\n{info.get('location', '')}")
+
+        # Summary
+        if data.get('summary'):
+            sections.append(f"\nPROFESSIONAL SUMMARY\n{data['summary']}")
         
         # Education
         if 'education' in data:
@@ -0,0 +1,279 @@
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+from src.parsers.parser import text_sections
+
+# Fields scoring at least this much are used as-is; the rest go to the LLM
+FIELD_CONFIDENCE = 0.8
+# Below this average the text is not well-formed enough to trust any field
+MIN_CONFIDENCE = 0.5
+# Fields resting on a guess, such as which half of "A - B" is the title, stay below FIELD_CONFIDENCE
+GUESS_CONFIDENCE = 0.6
+
+# Bump when the rules change so cached extractions from older rules are ignored
+EXTRACTOR_VERSION = 3
+
+MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE = rf'(?:(?:{MONTH}\s+)?(?:19|20)\d{{2}}|\d{{1,2}}/(?:19|20)\d{{2}}|present|current|now)'
+DURATION = rf'{DATE}(?:\s*(?:-|–|—|to)\s*{DATE})?'
+# A date or date range closing a line, optionally in parentheses or after a separator
+TRAILING_DURATION_PATTERN = re.compile(rf'[\s,|•·–—-]*\(?({DURATION})\)?\s*$', re.IGNORECASE)
+DURATION_LINE_PATTERN = re.compile(rf'^\(?{DURATION}\)?$', re.IGNORECASE)
+
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_PATTERN = re.compile(r'(?<![\w/])[+(]?\d[\d\s().-]{6,}\d(?![\w/])')
+GPA_PATTERN = re.compile(r'^(?:gpa|cgpa)\s*[:\-]?\s*(.+)$', re.IGNORECASE)
+BULLET_PATTERN = re.compile(r'^(?:[-*•▸◆●▪–]|\d+[.)])\s+')
+CONTACT_SEPARATOR_PATTERN = re.compile(r'\s*[|•·]\s*')
+SKILL_SEPARATOR_PATTERN = re.compile(r'\s*[,;|•·]\s*')
+SKILL_CATEGORY_PATTERN = re.compile(r'^[\w &/+-]{1,30}:\s+')
+# Separators between the two halves of an entry heading, tried in this order
+ROLE_SEPARATORS = (' at ', ' @ ', ' | ', ' – ', ' — ', ' - ', ', ')
+EDUCATION_SEPARATORS = (' | ', ' – ', ' — ', ' - ', ' from ', ' at ', ', ')
+PROJECT_SEPARATORS = (': ', ' – ', ' — ', ' - ')
+# Only these say which half is which; "Company - Title" is as common as "Title - Company"
+ORDERED_SEPARATORS = (' at ', ' @ ', ' from ')
+# Either keyword settles which half of an education entry is the degree
+DEGREE_PATTERN = re.compile(
+    r'\b(?:[bm]\.?(?:sc|s|a|tech|e|eng|com|phil|ba)\.?(?!\w)|bachelor|master|ph\.?\s?d|doctor|diploma|associate'
+    r'|certificat|mba|bba|llb|llm|degree)', re.IGNORECASE)
+INSTITUTION_PATTERN = re.compile(r'\b(?:universit|college|institut|school|academy|polytechnic|conservator)',
+                                 re.IGNORECASE)
+
+
+def _clean(line: str) -> str:
+    """Strip whitespace and markdown emphasis, keeping any bullet marker"""
+    return line.strip().strip('*#').strip()
+
+
+def _unbullet(line: str) -> str:
+    return BULLET_PATTERN.sub('', line)
+
+
+def _split_once(text: str, separators: Tuple[str, ...]) -> Tuple[List[str], Optional[str]]:
+    """The two halves of text around the first separator that splits it, and that separator"""
+    for separator in separators:
+        if separator in text:
+            left, right = text.split(separator, 1)
+            if left.strip() and right.strip():
+                return [left.strip(), right.strip()], separator
+    return [text.strip()], None
+
+
+def _orient_education(parts: List[str]) -> Tuple[List[str], bool]:
+    """Degree and institution in that order, and whether keywords rather than position decided it"""
+    def kind(text: str) -> Optional[str]:
+        degree, institution = DEGREE_PATTERN.search(text), INSTITUTION_PATTERN.search(text)
+        return None if bool(degree) == bool(institution) else 'degree' if degree else 'institution'
+
+    left, right = kind(parts[0]), kind(parts[1])
+    if left == 'degree' or right == 'institution':
+        return parts, right != 'degree' and left != 'institution'
+    if left == 'institution' or right == 'degree':
+        return parts[::-1], True
+    return parts, False
+
+
+def _trailing_duration(line: str) -> Tuple[str, Optional[str]]:
+    """Split a line into its text and a closing date or date range, if any"""
+    match = TRAILING_DURATION_PATTERN.search(line)
+    if match is None or match.start() == 0:
+        return line, None
+    return line[:match.start()].strip(' ,|-–—('), match.group(1)
+
+
+def _section_bodies(text: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Preamble lines and content lines per section name, merging repeated sections"""
+    sections = text_sections(text)
+    preamble_end = sections[0]['start'] if sections else len(text)
+    preamble = [_unbullet(line) for line in map(_clean, text[:preamble_end].split("\n")) if line]
+    bodies: Dict[str, List[str]] = {}
+    for section in sections:
+        lines = text[section['start']:section['end']].split("\n")
+        # "SKILLS: PYTHON, SQL" carries content on the heading line itself
+        inline = lines[0].partition(':')[2]
+        body = bodies.setdefault(section['name'], [])
+        body.extend(line for line in map(_clean, [inline] + lines[1:]) if line)
+    return preamble, bodies
+
+
+def _personal_info(labelled: List[str], preamble: List[str]) -> Tuple[Dict[str, str], float, List[str]]:
+    """Contact details from a contact section and the header lines, with the header lines left unused.
+
+    The location is taken from a "City, Region" part, or from any leftover
+    short line inside a labelled contact section.
+    """
+    info = {'name': '', 'email': '', 'phone': '', 'location': ''}
+    rest = []
+    # Phone-like text inside a longer part, such as "Phone: (555) 123-4567", is left to the LLM
+    missed_phone = False
+    for line in labelled + preamble:
+        used = False
+        for part in CONTACT_SEPARATOR_PATTERN.split(line):
+            email = EMAIL_PATTERN.search(part)
+            plain = not re.search(r'[\d@/]|\.\w{2,}', part)
+            if email:
+                info['email'] = info['email'] or email.group(0)
+            elif PHONE_PATTERN.fullmatch(part):
+                info['phone'] = info['phone'] or part
+            elif PHONE_PATTERN.search(part):
+                missed_phone = True
+                continue
+            elif plain and not info['name'] and len(part.split()) <= 5:
+                info['name'] = part
+            elif plain and not info['location'] and len(part.split()) <= 6 and (',' in part or line in labelled):
+                info['location'] = part
+            else:
+                continue
+            used = True
+        if not used and line not in labelled:
+            rest.append(line)
+    if not info['name']:
+        return info, 0.0, rest
+    if missed_phone and not info['phone']:
+        return info, GUESS_CONFIDENCE, rest
+    return info, 1.0 if info['email'] or info['phone'] else 0.5, rest
+
+
+def _skills(lines: List[str]) -> Tuple[List[str], float]:
+    skills = []
+    for line in lines:
+        line = SKILL_CATEGORY_PATTERN.sub('', _unbullet(line))
+        skills.extend(item for item in SKILL_SEPARATOR_PATTERN.split(line) if item)
+    if not skills:
+        return [], 1.0
+    short = sum(1 for skill in skills if len(skill.split()) <= 5)
+    return skills, short / len(skills)
+
+
+def _education(lines: List[str]) -> Tuple[List[Dict[str, str]], float]:
+    """Entries like "Degree - Institution (2020)", possibly with the degree on its own line"""
+    entries = []
+    pending: List[str] = []
+    unmatched = 0
+    guessed = False
+    for line in map(_unbullet, lines):
+        gpa = GPA_PATTERN.match(line)
+        if gpa and entries:
+            entries[-1]['gpa'] = gpa.group(1).strip()
+            continue
+        head, year = _trailing_duration(line)
+        if year is None:
+            pending.append(line)
+            continue
+        halves, separator = _split_once(head, EDUCATION_SEPARATORS)
+        parts = pending + halves
+        pending = []
+        if len(parts) != 2:
+            unmatched += 1
+            parts = (parts + [''])[:2]
+        elif separator is not None and separator not in ORDERED_SEPARATORS:
+            parts, settled = _orient_education(parts)
+            guessed = guessed or not settled
+        entries.append({'degree': parts[0], 'institution': parts[1], 'year': year})
+    unmatched += len(pending)
+    if not entries:
+        return [], 0.0 if unmatched else 1.0
+    coverage = len(entries) / (len(entries) + unmatched)
+    return entries, min(coverage, GUESS_CONFIDENCE) if guessed else coverage
+
+
+def _experience(lines: List[str]) -> Tuple[List[Dict[str, Any]], float]:
+    """Entries headed by "Title at Company (2019 - Present)".
+
+    Prose lines after a heading become its description and bulleted lines
+    its responsibilities, which every template renders as bullets.
+    """
+    entries: List[Dict[str, Any]] = []
+    orphans = 0
+    guessed = False
+    for line in lines:
+        bulleted = BULLET_PATTERN.match(line) is not None
+        line = _unbullet(line)
+        head, duration = _trailing_duration(line)
+        parts, separator = _split_once(head, ROLE_SEPARATORS) if duration is not None or ' at ' in line else ([], None)
+        # Headings are short and never bulleted or full sentences
+        if (not bulleted and len(parts) == 2 and len(parts[0].split()) <= 6 and len(parts[1].split()) <= 8
+                and '. ' not in head and not line.endswith('.')):
+            entries.append({'title': parts[0], 'company': parts[1], 'duration': duration or '',
+                            'description': [], 'responsibilities': []})
+            guessed = guessed or separator not in ORDERED_SEPARATORS
+        elif DURATION_LINE_PATTERN.match(line) and entries and not entries[-1]['duration']:
+            entries[-1]['duration'] = line.strip('()')
+        elif entries:
+            entries[-1]['responsibilities' if bulleted else 'description'].append(line)
+        else:
+            orphans += 1
+    for entry in entries:
+        entry['description'] = ' '.join(entry['description'])
+        if not entry['responsibilities']:
+            del entry['responsibilities']
+    if not entries:
+        return [], 0.0 if orphans else 1.0
+    complete = sum(1 for entry in entries if entry['duration'])
+    score = complete / len(entries) * (0.5 if orphans else 1.0)
+    return entries, min(score, GUESS_CONFIDENCE) if guessed else score
+
+
+def _projects(lines: List[str]) -> Tuple[List[Dict[str, str]], float]:
+    """Entries like "Name: description", or a short name line followed by its description"""
+    entries: List[Dict[str, str]] = []
+    for line in map(_unbullet, lines):
+        parts, _ = _split_once(line, PROJECT_SEPARATORS)
+        if len(parts) == 2 and len(parts[0].split()) <= 6:
+            entries.append({'name': parts[0], 'description': parts[1]})
+        elif entries and entries[-1]['description']:
+            if len(line.split()) <= 6 and not line.endswith('.'):
+                entries.append({'name': line, 'description': ''})
+            else:
+                entries[-1]['description'] += ' ' + line
+        elif entries:
+            entries[-1]['description'] = line
+        else:
+            entries.append({'name': line, 'description': ''})
+    if not entries:
+        return [], 1.0
+    described = sum(1 for entry in entries if entry['description'])
+    return entries, described / len(entries)
+
+
+def extract_fields(text: str) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Fill EnhancedResume fields from section headings without an LLM.
+
+    Returns the fields and a 0-1 confidence per field. A resume with two or
+    more recognised sections counts as structured, so a list section it does
+    not have is confidently empty; unstructured text scores low everywhere.
+    """
+    preamble, bodies = _section_bodies(text)
+    structured = len(bodies) >= 2
+    fields: Dict[str, Any] = {}
+    confidence: Dict[str, float] = {}
+
+    fields['personal_info'], confidence['personal_info'], rest = _personal_info(
+        bodies.get('personal_info', []), preamble)
+
+    if 'summary' in bodies:
+        fields['summary'] = ' '.join(map(_unbullet, bodies['summary']))
+        confidence['summary'] = 1.0
+    else:
+        # Enhanced resumes often open with an untitled summary paragraph
+        prose = [line for line in rest if len(line.split()) >= 8]
+        fields['summary'] = ' '.join(prose)
+        # A structured resume with no header prose left over simply has no summary
+        confidence['summary'] = 0.9 if structured and (prose or not rest) else 0.0
+
+    for name, extract in (('education', _education), ('skills', _skills),
+                          ('experience', _experience), ('projects', _projects)):
+        if name in bodies:
+            fields[name], confidence[name] = extract(bodies[name])
+        else:
+            fields[name], confidence[name] = [], 0.9 if structured else 0.0
+    return fields, confidence
+
+
+def resolved_fields(text: str) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Fields confident enough to skip the LLM, and the confidence of every field"""
+    fields, confidence = extract_fields(text)
+    if sum(confidence.values()) / len(confidence) < MIN_CONFIDENCE:
+        return {}, confidence
+    return {name: value for name, value in fields.items() if confidence[name] >= FIELD_CONFIDENCE}, confidence
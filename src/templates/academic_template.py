@@ -1,233 +1,119 @@
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from functools import lru_cache
 import os
 
-def add_bottom_border(paragraph, color='2E4053', size='18'):
-    """Add a bottom border to a paragraph"""
-    p = paragraph._p
-    pPr = p.get_or_add_pPr()
-    pBdr = OxmlElement('w:pBdr')
-    bottom = OxmlElement('w:bottom')
-    bottom.set(qn('w:val'), 'single')
-    bottom.set(qn('w:sz'), size)
-    bottom.set(qn('w:space'), '1')
-    bottom.set(qn('w:color'), color)
-    pBdr.append(bottom)
-    pPr.append(pBdr)
+from src.templates.layout import Block, Run, block, render_docx
+from src.templates.styles import compile_template
 
-def generate_academic_docx(resume_data, output_dir, filename):
-    doc = Document()
-    
-    # Set traditional academic margins
-    for section in doc.sections:
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
+PRIMARY = '2E4053'  # Academic dark gray-blue
+ACCENT = '8B4513'  # Academic brown
+
+HEADING = {'space_before': 16, 'space_after': 8, 'size': 14, 'bold': True, 'color': PRIMARY, 'border': (ACCENT, '12')}
+
+ACADEMIC_SPEC = {
+    # Traditional academic margins
+    'margins': {'top': 1, 'bottom': 1, 'left': 1, 'right': 1},
+    'paragraph': {
+        'Resume Name': {'align': 'center', 'size': 22, 'bold': True, 'color': PRIMARY, 'border': (PRIMARY, '24')},
+        'Resume Contact': {'align': 'center', 'space_after': 16, 'size': 10, 'color': '505050'},
+        'Resume Heading': HEADING,
+        # Directly below the contact block
+        'Resume First Heading': dict(HEADING, space_before=12),
+        'Resume Entry': {'space_before': 8, 'size': 11, 'bold': True, 'color': PRIMARY},
+        'Resume Meta': {'left_indent': 0.25, 'size': 10, 'italic': True},
+        'Resume GPA': {'left_indent': 0.25, 'size': 10, 'bold': True, 'color': ACCENT},
+        'Resume Description': {'left_indent': 0.25, 'space_after': 4, 'size': 10},
+        'Resume Bullet': {'left_indent': 0.5, 'first_line_indent': -0.15, 'space_after': 3, 'size': 10},
+        'Resume Project': {'left_indent': 0.25, 'space_after': 6, 'size': 10},
+        'Resume Skills': {'left_indent': 0.25, 'size': 10},
+        'Resume Summary': {'left_indent': 0.25, 'align': 'justify', 'size': 10},
+    },
+    'character': {
+        'Resume Muted': {'color': '646464'},
+        'Resume Accent': {'color': ACCENT},
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def base_document() -> bytes:
+    return compile_template(ACADEMIC_SPEC)
+
+def layout_academic(resume_data):
+    """Document tree for the academic template"""
+    blocks = []
 
     info = resume_data.get('personal_info', {})
-    
-    # Name (Large, Centered, Dark Academic Color)
-    name_para = doc.add_paragraph()
-    name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    name_run = name_para.add_run(info.get('name', '').upper())
-    name_run.font.size = Pt(22)
-    name_run.font.bold = True
-    name_run.font.color.rgb = RGBColor(46, 64, 83)  # Academic dark gray-blue
-    add_bottom_border(name_para, '2E4053', '24')
-    
-    # Contact Information (Centered)
-    contact_para = doc.add_paragraph()
-    contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    contact_para.paragraph_format.space_after = Pt(16)
-    
-    email_run = contact_para.add_run(info.get('email', ''))
-    email_run.font.size = Pt(10)
-    email_run.font.color.rgb = RGBColor(80, 80, 80)
-    
-    contact_para.add_run(' • ')
-    
-    phone_run = contact_para.add_run(info.get('phone', ''))
-    phone_run.font.size = Pt(10)
-    phone_run.font.color.rgb = RGBColor(80, 80, 80)
-    
+
+    # Name and contact information
+    blocks.append(block('Resume Name', info.get('name', '').upper()))
+    contact = [info.get('email', ''), info.get('phone', '')]
     if info.get('location'):
-        contact_para.add_run(' • ')
-        location_run = contact_para.add_run(info.get('location', ''))
-        location_run.font.size = Pt(10)
-        location_run.font.color.rgb = RGBColor(80, 80, 80)
+        contact.append(info['location'])
+    blocks.append(block('Resume Contact', ' • '.join(contact)))
 
     # Education Section (Most Important for Academic)
     if resume_data.get('education'):
-        edu_heading = doc.add_paragraph('EDUCATION')
-        edu_heading.paragraph_format.space_before = Pt(12)
-        edu_heading.paragraph_format.space_after = Pt(8)
-        edu_run = edu_heading.runs[0]
-        edu_run.font.size = Pt(14)
-        edu_run.font.bold = True
-        edu_run.font.color.rgb = RGBColor(46, 64, 83)
-        add_bottom_border(edu_heading, '8B4513', '12')  # Brown academic color
-        
+        blocks.append(block('Resume First Heading', 'EDUCATION'))
+
         for edu in resume_data['education']:
-            # Degree (Bold)
-            degree_para = doc.add_paragraph()
-            degree_para.paragraph_format.space_before = Pt(8)
-            degree_run = degree_para.add_run(edu.get('degree', ''))
-            degree_run.font.size = Pt(11)
-            degree_run.font.bold = True
-            degree_run.font.color.rgb = RGBColor(46, 64, 83)
-            
-            # Institution and Year
-            institution_para = doc.add_paragraph()
-            institution_para.paragraph_format.left_indent = Inches(0.25)
-            
-            inst_run = institution_para.add_run(edu.get('institution', ''))
-            inst_run.font.size = Pt(10)
-            inst_run.font.italic = True
-            
-            institution_para.add_run(' • ')
-            
-            year_run = institution_para.add_run(edu.get('year', ''))
-            year_run.font.size = Pt(10)
-            year_run.font.italic = True
-            year_run.font.color.rgb = RGBColor(100, 100, 100)
-            
-            # GPA if present
+            blocks.append(block('Resume Entry', edu.get('degree', '')))
+            blocks.append(Block('Resume Meta', (
+                Run(f"{edu.get('institution', '')} • "),
+                Run(edu.get('year', ''), 'Resume Muted'),
+            )))
+
             if edu.get('gpa'):
-                gpa_para = doc.add_paragraph()
-                gpa_para.paragraph_format.left_indent = Inches(0.25)
-                gpa_run = gpa_para.add_run(f"GPA: {edu['gpa']}")
-                gpa_run.font.size = Pt(10)
-                gpa_run.font.bold = True
-                gpa_run.font.color.rgb = RGBColor(139, 69, 19)  # Academic brown
+                blocks.append(block('Resume GPA', f"GPA: {edu['gpa']}"))
 
     # Research Experience / Work Experience
     if resume_data.get('experience'):
-        exp_heading = doc.add_paragraph('RESEARCH & PROFESSIONAL EXPERIENCE')
-        exp_heading.paragraph_format.space_before = Pt(16)
-        exp_heading.paragraph_format.space_after = Pt(8)
-        exp_run = exp_heading.runs[0]
-        exp_run.font.size = Pt(14)
-        exp_run.font.bold = True
-        exp_run.font.color.rgb = RGBColor(46, 64, 83)
-        add_bottom_border(exp_heading, '8B4513', '12')
-        
+        blocks.append(block('Resume Heading', 'RESEARCH & PROFESSIONAL EXPERIENCE'))
+
         for exp in resume_data['experience']:
-            # Position Title (Bold)
-            title_para = doc.add_paragraph()
-            title_para.paragraph_format.space_before = Pt(8)
-            title_run = title_para.add_run(exp.get('title', ''))
-            title_run.font.size = Pt(11)
-            title_run.font.bold = True
-            title_run.font.color.rgb = RGBColor(46, 64, 83)
-            
-            # Institution/Company and Duration
-            company_para = doc.add_paragraph()
-            company_para.paragraph_format.left_indent = Inches(0.25)
-            
-            company_run = company_para.add_run(exp.get('company', ''))
-            company_run.font.size = Pt(10)
-            company_run.font.italic = True
-            
-            company_para.add_run(' • ')
-            
-            duration_run = company_para.add_run(exp.get('duration', ''))
-            duration_run.font.size = Pt(10)
-            duration_run.font.italic = True
-            duration_run.font.color.rgb = RGBColor(100, 100, 100)
-            
-            # Description
+            blocks.append(block('Resume Entry', exp.get('title', '')))
+            blocks.append(Block('Resume Meta', (
+                Run(f"{exp.get('company', '')} • "),
+                Run(exp.get('duration', ''), 'Resume Muted'),
+            )))
+
             if exp.get('description'):
-                desc_para = doc.add_paragraph()
-                desc_para.paragraph_format.left_indent = Inches(0.25)
-                desc_para.paragraph_format.space_after = Pt(4)
-                desc_run = desc_para.add_run(exp['description'])
-                desc_run.font.size = Pt(10)
-            
+                blocks.append(block('Resume Description', exp['description']))
+
             # Responsibilities/Achievements
-            if exp.get('responsibilities'):
-                for resp in exp['responsibilities']:
-                    resp_para = doc.add_paragraph()
-                    resp_para.paragraph_format.left_indent = Inches(0.5)
-                    resp_para.paragraph_format.first_line_indent = Inches(-0.15)
-                    resp_para.paragraph_format.space_after = Pt(3)
-                    
-                    bullet_run = resp_para.add_run('◆ ')
-                    bullet_run.font.color.rgb = RGBColor(139, 69, 19)
-                    
-                    resp_run = resp_para.add_run(resp)
-                    resp_run.font.size = Pt(10)
+            for resp in exp.get('responsibilities') or []:
+                blocks.append(Block('Resume Bullet', (Run('◆ ', 'Resume Accent'), Run(resp))))
 
     # Projects/Publications Section
     if resume_data.get('projects'):
-        proj_heading = doc.add_paragraph('PROJECTS & RESEARCH')
-        proj_heading.paragraph_format.space_before = Pt(16)
-        proj_heading.paragraph_format.space_after = Pt(8)
-        proj_run = proj_heading.runs[0]
-        proj_run.font.size = Pt(14)
-        proj_run.font.bold = True
-        proj_run.font.color.rgb = RGBColor(46, 64, 83)
-        add_bottom_border(proj_heading, '8B4513', '12')
-        
+        blocks.append(block('Resume Heading', 'PROJECTS & RESEARCH'))
+
         for proj in resume_data['projects']:
-            # Project Name (Bold)
-            proj_name_para = doc.add_paragraph()
-            proj_name_para.paragraph_format.space_before = Pt(8)
-            proj_name_run = proj_name_para.add_run(proj.get('name', ''))
-            proj_name_run.font.size = Pt(11)
-            proj_name_run.font.bold = True
-            proj_name_run.font.color.rgb = RGBColor(46, 64, 83)
-            
-            # Project Description
-            proj_desc_para = doc.add_paragraph()
-            proj_desc_para.paragraph_format.left_indent = Inches(0.25)
-            proj_desc_para.paragraph_format.space_after = Pt(6)
-            proj_desc_run = proj_desc_para.add_run(proj.get('description', ''))
-            proj_desc_run.font.size = Pt(10)
+            blocks.append(block('Resume Entry', proj.get('name', '')))
+            blocks.append(block('Resume Project', proj.get('description', '')))
 
     # Skills & Technical Competencies
     if resume_data.get('skills'):
-        skills_heading = doc.add_paragraph('TECHNICAL SKILLS')
-        skills_heading.paragraph_format.space_before = Pt(16)
-        skills_heading.paragraph_format.space_after = Pt(8)
-        skills_run = skills_heading.runs[0]
-        skills_run.font.size = Pt(14)
-        skills_run.font.bold = True
-        skills_run.font.color.rgb = RGBColor(46, 64, 83)
-        add_bottom_border(skills_heading, '8B4513', '12')
-        
-        skills_para = doc.add_paragraph()
-        skills_para.paragraph_format.left_indent = Inches(0.25)
-        
-        # Group skills with bullet points
+        blocks.append(block('Resume Heading', 'TECHNICAL SKILLS'))
+
+        runs = []
         for i, skill in enumerate(resume_data['skills']):
-            skill_run = skills_para.add_run(skill)
-            skill_run.font.size = Pt(10)
-            
-            if i < len(resume_data['skills']) - 1:
-                sep_run = skills_para.add_run(' • ')
-                sep_run.font.color.rgb = RGBColor(139, 69, 19)
+            if i:
+                runs.append(Run(' • ', 'Resume Accent'))
+            runs.append(Run(skill))
+        blocks.append(Block('Resume Skills', tuple(runs)))
 
     # Professional Summary (if exists)
     if resume_data.get('summary'):
-        summary_heading = doc.add_paragraph('PROFESSIONAL SUMMARY')
-        summary_heading.paragraph_format.space_before = Pt(16)
-        summary_heading.paragraph_format.space_after = Pt(8)
-        summary_run = summary_heading.runs[0]
-        summary_run.font.size = Pt(14)
-        summary_run.font.bold = True
-        summary_run.font.color.rgb = RGBColor(46, 64, 83)
-        add_bottom_border(summary_heading, '8B4513', '12')
-        
-        summary_para = doc.add_paragraph(resume_data['summary'])
-        summary_para.paragraph_format.left_indent = Inches(0.25)
-        summary_para.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-        for run in summary_para.runs:
-            run.font.size = Pt(10)
+        blocks.append(block('Resume Heading', 'PROFESSIONAL SUMMARY'))
+        blocks.append(block('Resume Summary', resume_data['summary']))
+
+    return blocks
 
+def build_academic_docx(resume_data):
+    """Build the academic resume as an in-memory Document"""
+    return render_docx(layout_academic(resume_data), base_document())
+
+def generate_academic_docx(resume_data, output_dir, filename):
     path = os.path.join(output_dir, filename)
-    doc.save(path)
-    return path
\ No newline at end of file
+    build_academic_docx(resume_data).save(path)
+    return path
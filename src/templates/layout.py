@@ -0,0 +1,38 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+from src.templates.styles import add_paragraph, add_run, new_document
+
+
+class Run(NamedTuple):
+    """A span of text with an optional character style name"""
+    text: str
+    style: Optional[str] = None
+
+
+class Block(NamedTuple):
+    """A paragraph in the resume document tree; a block without a style is a spacer"""
+    style: Optional[str]
+    runs: Tuple[Run, ...] = ()
+
+    @property
+    def text(self) -> str:
+        return ''.join(run.text for run in self.runs)
+
+
+def block(style: Optional[str], text: str = '') -> Block:
+    """Single-run block"""
+    return Block(style, (Run(text),) if text else ())
+
+
+def render_docx(blocks: List[Block], base: bytes):
+    """DOCX backend: lay the document tree out on a clone of a compiled base document"""
+    doc, styles = new_document(base)
+    for item in blocks:
+        style_id = styles[item.style] if item.style else None
+        if len(item.runs) == 1 and item.runs[0].style is None:
+            add_paragraph(doc, item.runs[0].text, style_id)
+            continue
+        paragraph = add_paragraph(doc, style_id=style_id)
+        for run in item.runs:
+            add_run(paragraph, run.text, styles[run.style] if run.style else None)
+    return doc
@@ -1,175 +1,101 @@
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from functools import lru_cache
 import os
 
-def add_horizontal_line(paragraph):
-    """Add a horizontal line below a paragraph"""
-    p = paragraph._p
-    pPr = p.get_or_add_pPr()
-    pBdr = OxmlElement('w:pBdr')
-    bottom = OxmlElement('w:bottom')
-    bottom.set(qn('w:val'), 'single')
-    bottom.set(qn('w:sz'), '12')
-    bottom.set(qn('w:space'), '1')
-    bottom.set(qn('w:color'), '2C5F8D')
-    pBdr.append(bottom)
-    pPr.append(pBdr)
+from src.templates.layout import block, render_docx
+from src.templates.styles import compile_template
 
-def generate_professional_docx(resume_data, output_dir, filename):
-    doc = Document()
-    
-    # Set margins
-    for section in doc.sections:
-        section.top_margin = Inches(0.5)
-        section.bottom_margin = Inches(0.5)
-        section.left_margin = Inches(0.7)
-        section.right_margin = Inches(0.7)
-
-    # Header - Name (Large, Bold, Dark Blue)
+PRIMARY = '2C5F8D'  # Professional dark blue
+
+PROFESSIONAL_SPEC = {
+    'margins': {'top': 0.5, 'bottom': 0.5, 'left': 0.7, 'right': 0.7},
+    'paragraph': {
+        'Resume Name': {'align': 'center', 'size': 24, 'bold': True, 'color': PRIMARY},
+        'Resume Contact': {'align': 'center', 'size': 10, 'color': '505050'},
+        'Resume Heading': {'size': 13, 'bold': True, 'color': PRIMARY, 'border': (PRIMARY, '12')},
+        'Resume Body': {'size': 10, 'space_after': 12},
+        'Resume Entry': {'size': 11, 'bold': True, 'color': PRIMARY},
+        'Resume Degree': {'size': 11, 'bold': True},
+        'Resume Meta': {'size': 10, 'italic': True, 'color': '646464'},
+        'Resume Institution': {'size': 10, 'color': '646464'},
+        'Resume Description': {'size': 10, 'left_indent': 0.25, 'space_after': 6},
+        'Resume Bullet': {'size': 10, 'left_indent': 0.25, 'space_after': 4},
+        'Resume Detail': {'size': 10, 'left_indent': 0.25},
+        'Resume Project': {'size': 10, 'left_indent': 0.25, 'space_after': 8},
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def base_document() -> bytes:
+    return compile_template(PROFESSIONAL_SPEC)
+
+def layout_professional(resume_data):
+    """Document tree for the professional template"""
+    blocks = []
+
+    # Header - Name and contact info
     info = resume_data.get('personal_info', {})
-    name_para = doc.add_paragraph()
-    name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    name_run = name_para.add_run(info.get('name', '').upper())
-    name_run.font.size = Pt(24)
-    name_run.font.bold = True
-    name_run.font.color.rgb = RGBColor(44, 95, 141)  # Professional dark blue
-    
-    # Contact Info (Centered, Gray)
-    contact_para = doc.add_paragraph()
-    contact_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    contact_run = contact_para.add_run(
+    blocks.append(block('Resume Name', info.get('name', '').upper()))
+    blocks.append(block(
+        'Resume Contact',
         f"{info.get('email', '')} • {info.get('phone', '')} • {info.get('location', '')}"
-    )
-    contact_run.font.size = Pt(10)
-    contact_run.font.color.rgb = RGBColor(80, 80, 80)
-    
-    doc.add_paragraph()  # Spacer
+    ))
+
+    blocks.append(block(None))  # Spacer
 
     # Professional Summary Section
     if resume_data.get('summary'):
-        summary_heading = doc.add_paragraph()
-        summary_run = summary_heading.add_run('PROFESSIONAL SUMMARY')
-        summary_run.font.size = Pt(13)
-        summary_run.font.bold = True
-        summary_run.font.color.rgb = RGBColor(44, 95, 141)
-        add_horizontal_line(summary_heading)
-        
-        summary_text = doc.add_paragraph(resume_data['summary'])
-        summary_text.paragraph_format.space_after = Pt(12)
-        for run in summary_text.runs:
-            run.font.size = Pt(10)
+        blocks.append(block('Resume Heading', 'PROFESSIONAL SUMMARY'))
+        blocks.append(block('Resume Body', resume_data['summary']))
 
     # Skills Section
     if resume_data.get('skills'):
-        skills_heading = doc.add_paragraph()
-        skills_run = skills_heading.add_run('CORE COMPETENCIES')
-        skills_run.font.size = Pt(13)
-        skills_run.font.bold = True
-        skills_run.font.color.rgb = RGBColor(44, 95, 141)
-        add_horizontal_line(skills_heading)
-        
-        skills_text = doc.add_paragraph(' • '.join(resume_data['skills']))
-        skills_text.paragraph_format.space_after = Pt(12)
-        for run in skills_text.runs:
-            run.font.size = Pt(10)
+        blocks.append(block('Resume Heading', 'CORE COMPETENCIES'))
+        blocks.append(block('Resume Body', ' • '.join(resume_data['skills'])))
 
     # Work Experience Section
     if resume_data.get('experience'):
-        exp_heading = doc.add_paragraph()
-        exp_run = exp_heading.add_run('PROFESSIONAL EXPERIENCE')
-        exp_run.font.size = Pt(13)
-        exp_run.font.bold = True
-        exp_run.font.color.rgb = RGBColor(44, 95, 141)
-        add_horizontal_line(exp_heading)
-        
+        blocks.append(block('Resume Heading', 'PROFESSIONAL EXPERIENCE'))
+
         for exp in resume_data['experience']:
-            # Job Title (Bold, Dark Blue)
-            job_para = doc.add_paragraph()
-            job_run = job_para.add_run(exp.get('title', ''))
-            job_run.font.size = Pt(11)
-            job_run.font.bold = True
-            job_run.font.color.rgb = RGBColor(44, 95, 141)
-            
-            # Company and Duration (Italic, Gray)
-            company_para = doc.add_paragraph()
-            company_run = company_para.add_run(
-                f"{exp.get('company', '')} | {exp.get('duration', '')}"
-            )
-            company_run.font.size = Pt(10)
-            company_run.font.italic = True
-            company_run.font.color.rgb = RGBColor(100, 100, 100)
-            
+            blocks.append(block('Resume Entry', exp.get('title', '')))
+            blocks.append(block('Resume Meta', f"{exp.get('company', '')} | {exp.get('duration', '')}"))
+
             # Description/Responsibilities
             if exp.get('description'):
-                desc_para = doc.add_paragraph(exp['description'])
-                desc_para.paragraph_format.left_indent = Inches(0.25)
-                desc_para.paragraph_format.space_after = Pt(6)
-                for run in desc_para.runs:
-                    run.font.size = Pt(10)
-            
-            if exp.get('responsibilities'):
-                for resp in exp['responsibilities']:
-                    resp_para = doc.add_paragraph(f'• {resp}')
-                    resp_para.paragraph_format.left_indent = Inches(0.25)
-                    resp_para.paragraph_format.space_after = Pt(4)
-                    for run in resp_para.runs:
-                        run.font.size = Pt(10)
-            
-            doc.add_paragraph()  # Space between jobs
+                blocks.append(block('Resume Description', exp['description']))
+
+            for resp in exp.get('responsibilities') or []:
+                blocks.append(block('Resume Bullet', f'• {resp}'))
+
+            blocks.append(block(None))  # Space between jobs
 
     # Education Section
     if resume_data.get('education'):
-        edu_heading = doc.add_paragraph()
-        edu_run = edu_heading.add_run('EDUCATION')
-        edu_run.font.size = Pt(13)
-        edu_run.font.bold = True
-        edu_run.font.color.rgb = RGBColor(44, 95, 141)
-        add_horizontal_line(edu_heading)
-        
+        blocks.append(block('Resume Heading', 'EDUCATION'))
+
         for edu in resume_data['education']:
-            degree_para = doc.add_paragraph()
-            degree_run = degree_para.add_run(edu.get('degree', ''))
-            degree_run.font.size = Pt(11)
-            degree_run.font.bold = True
-            
-            institution_para = doc.add_paragraph()
-            institution_run = institution_para.add_run(
-                f"{edu.get('institution', '')} | {edu.get('year', '')}"
-            )
-            institution_run.font.size = Pt(10)
-            institution_run.font.color.rgb = RGBColor(100, 100, 100)
-            
+            blocks.append(block('Resume Degree', edu.get('degree', '')))
+            blocks.append(block('Resume Institution', f"{edu.get('institution', '')} | {edu.get('year', '')}"))
+
             if edu.get('gpa'):
-                gpa_para = doc.add_paragraph(f"GPA: {edu['gpa']}")
-                gpa_para.paragraph_format.left_indent = Inches(0.25)
-                for run in gpa_para.runs:
-                    run.font.size = Pt(10)
+                blocks.append(block('Resume Detail', f"GPA: {edu['gpa']}"))
 
     # Projects Section
     if resume_data.get('projects'):
-        proj_heading = doc.add_paragraph()
-        proj_run = proj_heading.add_run('PROJECTS')
-        proj_run.font.size = Pt(13)
-        proj_run.font.bold = True
-        proj_run.font.color.rgb = RGBColor(44, 95, 141)
-        add_horizontal_line(proj_heading)
-        
+        blocks.append(block('Resume Heading', 'PROJECTS'))
+
         for proj in resume_data['projects']:
-            proj_name_para = doc.add_paragraph()
-            proj_name_run = proj_name_para.add_run(proj.get('name', ''))
-            proj_name_run.font.size = Pt(11)
-            proj_name_run.font.bold = True
-            proj_name_run.font.color.rgb = RGBColor(44, 95, 141)
-            
-            proj_desc_para = doc.add_paragraph(proj.get('description', ''))
-            proj_desc_para.paragraph_format.left_indent = Inches(0.25)
-            proj_desc_para.paragraph_format.space_after = Pt(8)
-            for run in proj_desc_para.runs:
-                run.font.size = Pt(10)
+            blocks.append(block('Resume Entry', proj.get('name', '')))
+            blocks.append(block('Resume Project', proj.get('description', '')))
+
+    return blocks
 
+def build_professional_docx(resume_data):
+    """Build the professional resume as an in-memory Document"""
+    return render_docx(layout_professional(resume_data), base_document())
+
+def generate_professional_docx(resume_data, output_dir, filename):
     path = os.path.join(output_dir, filename)
-    doc.save(path)
-    return path
\ No newline at end of file
+    build_professional_docx(resume_data).save(path)
+    return path
@@ -0,0 +1,121 @@
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+# WD_ALIGN_PARAGRAPH member per spec alignment; python-docx is imported on first render
+ALIGNMENTS = {
+    'center': 'CENTER',
+    'left': 'LEFT',
+    'justify': 'JUSTIFY',
+}
+
+
+def compile_template(spec: Dict[str, Any]) -> bytes:
+    """Compile a declarative template spec into a base .docx with named styles.
+
+    A spec has ``margins`` (inches), ``paragraph`` styles and ``character``
+    styles. Paragraph styles accept size, bold, italic, color, align,
+    space_before, space_after, left_indent, first_line_indent, border
+    (color, size) and shading; character styles accept the font keys only.
+    Renders clone the result with ``new_document`` and only set style names.
+    """
+    from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import Pt, Inches
+
+    doc = Document()
+
+    for section in doc.sections:
+        section.top_margin = Inches(spec['margins']['top'])
+        section.bottom_margin = Inches(spec['margins']['bottom'])
+        section.left_margin = Inches(spec['margins']['left'])
+        section.right_margin = Inches(spec['margins']['right'])
+
+    # Drop the stock Word styles so every render parses and writes a small styles part
+    styles_element = doc.styles.element
+    for child in list(styles_element):
+        if child.tag == qn('w:latentStyles'):
+            styles_element.remove(child)
+        elif child.tag == qn('w:style') and child.get(qn('w:default')) != '1':
+            styles_element.remove(child)
+
+    for name, props in spec.get('paragraph', {}).items():
+        style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = doc.styles['Normal']
+        _apply_font(style.font, props)
+        # Borders and shading come before spacing and indents in the pPr schema order
+        pPr = style.element.get_or_add_pPr()
+        if 'border' in props:
+            color, size = props['border']
+            pBdr = OxmlElement('w:pBdr')
+            bottom = OxmlElement('w:bottom')
+            bottom.set(qn('w:val'), 'single')
+            bottom.set(qn('w:sz'), size)
+            bottom.set(qn('w:space'), '1')
+            bottom.set(qn('w:color'), color)
+            pBdr.append(bottom)
+            pPr.append(pBdr)
+        if 'shading' in props:
+            shd = OxmlElement('w:shd')
+            shd.set(qn('w:val'), 'clear')
+            shd.set(qn('w:fill'), props['shading'])
+            pPr.append(shd)
+        fmt = style.paragraph_format
+        if 'align' in props:
+            fmt.alignment = getattr(WD_ALIGN_PARAGRAPH, ALIGNMENTS[props['align']])
+        if 'space_before' in props:
+            fmt.space_before = Pt(props['space_before'])
+        if 'space_after' in props:
+            fmt.space_after = Pt(props['space_after'])
+        if 'left_indent' in props:
+            fmt.left_indent = Inches(props['left_indent'])
+        if 'first_line_indent' in props:
+            fmt.first_line_indent = Inches(props['first_line_indent'])
+
+    for name, props in spec.get('character', {}).items():
+        style = doc.styles.add_style(name, WD_STYLE_TYPE.CHARACTER)
+        _apply_font(style.font, props)
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def new_document(base: bytes):
+    """Clone a compiled base document and return it with its style ids by name"""
+    from docx import Document
+    doc = Document(BytesIO(base))
+    return doc, {style.name: style.style_id for style in doc.styles}
+
+
+def add_paragraph(doc, text: str = '', style_id: Optional[str] = None):
+    """Append a paragraph, setting the style id directly.
+
+    python-docx resolves style objects with an XPath search per call, which
+    dominates render time for long resumes.
+    """
+    paragraph = doc.add_paragraph(text)
+    if style_id is not None:
+        paragraph._p.style = style_id
+    return paragraph
+
+
+def add_run(paragraph, text: str, style_id: Optional[str] = None):
+    run = paragraph.add_run(text)
+    if style_id is not None:
+        run._r.style = style_id
+    return run
+
+
+def _apply_font(font, props: Dict[str, Any]) -> None:
+    from docx.shared import Pt, RGBColor
+    if 'size' in props:
+        font.size = Pt(props['size'])
+    if 'bold' in props:
+        font.bold = props['bold']
+    if 'italic' in props:
+        font.italic = props['italic']
+    if 'color' in props:
+        font.color.rgb = RGBColor.from_string(props['color'])
@@ -1,12 +1,53 @@
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Union
+import numpy as np
 import re
 
+from src.tools.jd_service import JobDescriptionIndex
+
+COMMON_KEYWORDS = ('python', 'java', 'javascript', 'react', 'sql', 'aws',
+                   'docker', 'kubernetes', 'agile', 'team', 'leadership')
+REQUIRED_SECTIONS = ('education', 'experience', 'skills')
+ACTION_VERBS = ('developed', 'managed', 'led', 'created', 'implemented',
+                'designed', 'achieved', 'improved', 'increased', 'reduced')
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# The phone and achievement patterns are equivalent to
+#   r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+#   r'\b\d+%|\b\d+\+|\$\d+|\b\d+ (?:years|months)'
+# rewritten to start with a character class so the regex engine can skip
+# straight to candidate characters; the lookbehinds reproduce the leading \b
+PHONE_PATTERN = re.compile(r'\d(?<!\w\d)\d{2}[-.]?\d{3}[-.]?\d{4}\b')
+ACHIEVEMENT_PATTERN = re.compile(r'[\d$](?:(?<=\$)\d+|(?<!\w\d)(?<=\d)\d*(?:%|\+| (?:years|months)))')
+
+# All substring terms in one table, with the column ranges of each category
+TERM_TABLE = COMMON_KEYWORDS + REQUIRED_SECTIONS + ACTION_VERBS
+KEYWORD_COLUMNS = slice(0, len(COMMON_KEYWORDS))
+SECTION_COLUMNS = slice(KEYWORD_COLUMNS.stop, KEYWORD_COLUMNS.stop + len(REQUIRED_SECTIONS))
+VERB_COLUMNS = slice(SECTION_COLUMNS.stop, len(TERM_TABLE))
+
+# Columnar layout returned by ATSScorer.calculate_scores_batch
+SCORE_DTYPE = np.dtype([
+    ('score', np.int16),
+    ('keywords', np.int16),
+    ('formatting', np.int16),
+    ('contact_info', np.int16),
+    ('achievements', np.int16),
+    ('length', np.int16),
+    ('action_verbs', np.int16),
+])
+
 class ATSScorer:
     """Calculate ATS score and provide recommendations"""
     
     @staticmethod
-    def calculate_score(resume_text: str, job_description: str = "") -> Dict[str, Any]:
-        """Calculate ATS score based on various criteria"""
+    def calculate_score(resume_text: str, job_description: Union[str, JobDescriptionIndex] = "") -> Dict[str, Any]:
+        """Calculate ATS score based on various criteria.
+
+        When a job description (raw text or a prebuilt JobDescriptionIndex) is
+        given, keyword points measure coverage of its weighted terms instead of
+        the generic keyword list.
+        """
         score = 0
         max_score = 100
         feedback = []
@@ -60,27 +101,97 @@ class ATSScorer:
         }
     
     @staticmethod
-    def _check_keywords(text: str, job_desc: str) -> int:
+    def calculate_scores_batch(resume_texts: Iterable[str],
+                               job_description: Union[str, JobDescriptionIndex] = "",
+                               workers: int = 1) -> np.ndarray:
+        """Score a corpus of resumes, returning one SCORE_DTYPE record per resume.
+
+        Each document still gets the same per-document checks as calculate_score
+        (one substring test per TERM_TABLE term, plus the contact, achievement,
+        job-description and word-count passes). Only the conversion of raw hits
+        to points is vectorised over NumPy columns, so a single process is about
+        1.2x faster than per-call scoring (bench_ats); the gain is the columnar
+        output, and with workers > 1 the corpus is split across processes.
+        """
+        texts = list(resume_texts)
+        jd_index = ATSScorer._job_index(job_description)
+        if workers > 1 and len(texts) > workers:
+            chunk_size = -(-len(texts) // workers)
+            chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = pool.map(ATSScorer.calculate_scores_batch, chunks, [jd_index or ""] * len(chunks))
+                return np.concatenate(list(parts))
+
+        n = len(texts)
+        term_hits = np.zeros((n, len(TERM_TABLE)), dtype=bool)
+        has_email = np.zeros(n, dtype=bool)
+        has_phone = np.zeros(n, dtype=bool)
+        achievements = np.zeros(n, dtype=np.int32)
+        word_counts = np.zeros(n, dtype=np.int32)
+        jd_points = np.zeros(n, dtype=np.int32)
+
+        for i, text in enumerate(texts):
+            text_lower = text.lower()
+            term_hits[i] = [term in text_lower for term in TERM_TABLE]
+            if jd_index is not None:
+                jd_points[i] = jd_index.score(text)
+            has_email[i] = '@' in text and EMAIL_PATTERN.search(text) is not None
+            has_phone[i] = PHONE_PATTERN.search(text) is not None
+            achievements[i] = len(ACHIEVEMENT_PATTERN.findall(text))
+            word_counts[i] = len(text.split())
+
+        keywords_found = term_hits[:, KEYWORD_COLUMNS].sum(axis=1)
+        sections_found = term_hits[:, SECTION_COLUMNS].sum(axis=1)
+        verbs_found = term_hits[:, VERB_COLUMNS].sum(axis=1)
+
+        scores = np.zeros(n, dtype=SCORE_DTYPE)
+        if jd_index is not None:
+            scores['keywords'] = jd_points
+        else:
+            scores['keywords'] = np.minimum((keywords_found / len(COMMON_KEYWORDS) * 20).astype(np.int32), 20)
+        scores['formatting'] = (sections_found / len(REQUIRED_SECTIONS) * 20).astype(np.int32)
+        scores['contact_info'] = has_email * 5 + has_phone * 5
+        scores['achievements'] = np.minimum(achievements * 4, 20)
+        scores['length'] = np.select(
+            [(word_counts >= 400) & (word_counts <= 800), (word_counts >= 300) & (word_counts <= 1000)],
+            [10, 7],
+            default=5
+        )
+        scores['action_verbs'] = np.minimum((verbs_found / len(ACTION_VERBS) * 20).astype(np.int32), 20)
+        total = sum(scores[field].astype(np.int32) for field in SCORE_DTYPE.names[1:])
+        scores['score'] = np.minimum(total, 100)
+        return scores
+
+    @staticmethod
+    def _job_index(job_desc: Union[str, JobDescriptionIndex]) -> Union[JobDescriptionIndex, None]:
+        if isinstance(job_desc, JobDescriptionIndex):
+            return job_desc
+        if job_desc and job_desc.strip():
+            return JobDescriptionIndex.for_text(job_desc)
+        return None
+
+    @staticmethod
+    def _check_keywords(text: str, job_desc: Union[str, JobDescriptionIndex]) -> int:
         """Check for relevant keywords"""
-        common_keywords = ['python', 'java', 'javascript', 'react', 'sql', 'aws', 
-                          'docker', 'kubernetes', 'agile', 'team', 'leadership']
+        jd_index = ATSScorer._job_index(job_desc)
+        if jd_index is not None:
+            return jd_index.score(text)
         text_lower = text.lower()
-        found = sum(1 for kw in common_keywords if kw in text_lower)
-        return min(int((found / len(common_keywords)) * 20), 20)
+        found = sum(1 for kw in COMMON_KEYWORDS if kw in text_lower)
+        return min(int((found / len(COMMON_KEYWORDS)) * 20), 20)
     
     @staticmethod
     def _check_formatting(text: str) -> int:
         """Check resume structure"""
-        required_sections = ['education', 'experience', 'skills']
         text_lower = text.lower()
-        found = sum(1 for section in required_sections if section in text_lower)
-        return int((found / len(required_sections)) * 20)
+        found = sum(1 for section in REQUIRED_SECTIONS if section in text_lower)
+        return int((found / len(REQUIRED_SECTIONS)) * 20)
 
     @staticmethod
     def _check_contact_info(text: str) -> int:
         """Check for contact information"""
-        has_email = bool(re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text))
-        has_phone = bool(re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', text))
+        has_email = '@' in text and bool(EMAIL_PATTERN.search(text))
+        has_phone = bool(PHONE_PATTERN.search(text))
         score = 0
         if has_email: score += 5
         if has_phone: score += 5
@@ -89,7 +200,7 @@ class ATSScorer:
     @staticmethod
     def _check_achievements(text: str) -> int:
         """Check for quantifiable achievements"""
-        numbers = re.findall(r'\b\d+%|\b\d+\+|\$\d+|\b\d+ (?:years|months)', text)
+        numbers = ACHIEVEMENT_PATTERN.findall(text)
         return min(len(numbers) * 4, 20)
 
     @staticmethod
@@ -105,8 +216,6 @@ class ATSScorer:
     @staticmethod
     def _check_action_verbs(text: str) -> int:
         """Check for strong action verbs"""
-        action_verbs = ['developed', 'managed', 'led', 'created', 'implemented', 
-                       'designed', 'achieved', 'improved', 'increased', 'reduced']
         text_lower = text.lower()
-        found = sum(1 for verb in action_verbs if verb in text_lower)
-        return min(int((found / len(action_verbs)) * 20), 20)
\ No newline at end of file
+        found = sum(1 for verb in ACTION_VERBS if verb in text_lower)
+        return min(int((found / len(ACTION_VERBS)) * 20), 20)
\ No newline at end of file
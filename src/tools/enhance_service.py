@@ -1,14 +1,69 @@
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from dotenv import load_dotenv
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import cached_property
+from collections import Counter
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+from pydantic_objects import EnhancedResume
+import asyncio
+import contextvars
+import re
+import time
+
+from src.parsers.parser import chunk_sections, split_sections, text_sections
+from src.tools.ats_service import ATSScorer
+from src.tools.cache_service import ResultCache
+from src.tools.llm_gateway import LLMGateway, LazyChatModel, get_gateway
+from src.tools.tracing_service import get_tracer
+
+# Resumes at least this long (about 1,500 tokens) are enhanced chunk by chunk
+CHUNKED_MIN_CHARS = 6000
+# Upper bound on the size of one chunk, so latency follows the longest section
+CHUNK_MAX_CHARS = 3000
+
+FENCE_PATTERN = re.compile(r'^\s*```')
+BULLET_MARKER_PATTERN = re.compile(r'^(\s*)([-*•▪●◦])(?=\s)', re.MULTILINE)
+
+
+def merge_chunks(chunks: List[str], enhanced: List[str]) -> str:
+    """Join enhanced chunks in order, with a light local consistency pass.
+
+    Code fences are dropped, as are headings a chunk did not have (such as a
+    heading repeated on the second half of a split section); a heading the
+    model dropped is restored. Bullets follow the marker used most often
+    across the whole document.
+    """
+    merged = []
+    for chunk, output in zip(chunks, enhanced):
+        original = text_sections(chunk)
+        names = {section['name'] for section in original}
+        added = {section['heading'] for section in text_sections(output) if section['name'] not in names}
+        lines = [line for line in output.strip().split("\n")
+                 if not FENCE_PATTERN.match(line) and line.strip() not in added]
+        text = "\n".join(lines).strip()
+        if original and original[0]['start'] == 0:
+            kept = {section['name'] for section in text_sections(text)}
+            if original[0]['name'] not in kept:
+                text = f"{original[0]['heading']}\n{text}"
+        merged.append(text)
+    document = "\n\n".join(text for text in merged if text)
+    markers = Counter(match.group(2) for match in BULLET_MARKER_PATTERN.finditer(document))
+    if len(markers) > 1:
+        marker = markers.most_common(1)[0][0]
+        document = BULLET_MARKER_PATTERN.sub(lambda match: match.group(1) + marker, document)
+    return document
+
 
 class Enhancer:
-    def __init__(self):
-        load_dotenv()
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0.7
-        )
+    # Built on first LLM call; cache hits never import langchain_groq
+    llm = LazyChatModel()
+
+    def __init__(self, cache: Optional[ResultCache] = None,
+                 gateway: Optional[LLMGateway] = None):
+        self.model_name = "llama-3.3-70b-versatile"
+        self.temperature = 0.7
+        self.cache = cache
+        self.gateway = gateway or get_gateway()
+        # langchain_core pulls in langsmith, so it is imported with the first service, not the module
+        from langchain_core.prompts import PromptTemplate
         self.prompt = PromptTemplate(
             input_variables=["resume_text"],
             template="""
@@ -26,8 +81,412 @@ Resume:
 {resume_text}
 """
         )
+        self.structured_prompt = PromptTemplate(
+            input_variables=["resume_text"],
+            template="""
+You are a professional resume optimization assistant.
+
+Enhance the following resume by:
+1. Using strong action verbs and professional language
+2. Making descriptions more impactful and quantifiable
+3. Optimizing for ATS systems with relevant keywords
+4. Maintaining clarity and readability
+
+Return the enhanced resume as structured data. personal_info has name, email,
+phone and location; each education entry has degree, institution and year;
+each experience entry has title, company, duration and description; each
+project has name and description. Keep every fact from the original resume.
+
+Resume:
+{resume_text}
+"""
+        )
+        # Single-section enhancement for incremental re-enhancement of edited resumes
+        self.section_prompt = PromptTemplate(
+            input_variables=["section_text"],
+            template="""
+You are a professional resume optimization assistant.
+
+Enhance the following section of a resume by:
+1. Using strong action verbs and professional language
+2. Making descriptions more impactful and quantifiable
+3. Optimizing for ATS systems with relevant keywords
+4. Maintaining clarity and readability
+
+Keep the section heading line exactly as written and do not add other sections.
+Return ONLY the enhanced section text. No commentary or markdown.
+
+Section:
+{section_text}
+"""
+        )
+        # One part of a long resume, for chunked enhancement
+        self.chunk_prompt = PromptTemplate(
+            input_variables=["chunk_text"],
+            template="""
+You are a professional resume optimization assistant.
+
+The text below is one part of a longer resume; the other parts are enhanced separately.
+Enhance it by:
+1. Using strong action verbs and professional language
+2. Making descriptions more impactful and quantifiable
+3. Optimizing for ATS systems with relevant keywords
+4. Maintaining clarity and readability
+
+Keep every heading line exactly as written, keep all entries in their order,
+and do not add headings, sections or a summary that are not in this part.
+Return ONLY the enhanced text. No commentary or markdown.
+
+Part:
+{chunk_text}
+"""
+        )
+
+    @cached_property
+    def structured_llm(self):
+        """Enhancement and extraction in one round trip, validated against the schema"""
+        return self.llm.with_structured_output(EnhancedResume)
 
     def enhance_with_groq(self, resume_text: str) -> str:
+        key = self._cache_key(resume_text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        formatted_prompt = self.prompt.format(resume_text=resume_text)
+        response = self.gateway.invoke(self.llm, formatted_prompt)
+        enhanced = response.content.strip()
+        self._store_text(key, enhanced)
+        return enhanced
+
+    async def aenhance_with_groq(self, resume_text: str) -> str:
+        """Async variant of enhance_with_groq using the LangChain ainvoke path"""
+        key = self._cache_key(resume_text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        formatted_prompt = self.prompt.format(resume_text=resume_text)
+        response = await self.gateway.ainvoke(self.llm, formatted_prompt)
+        enhanced = response.content.strip()
+        self._store_text(key, enhanced)
+        return enhanced
+
+    def enhance_best_of(self, resume_text: str, candidates: int = 3, job_description: str = "",
+                        target_score: Optional[int] = None, deadline: Optional[float] = None) -> str:
+        """Sample several enhancements at once and return the one with the highest ATS score.
+
+        Stops waiting as soon as a candidate reaches ``target_score``, or once
+        ``deadline`` seconds have passed and at least one candidate is in.
+        Calls still in flight then finish in the background and are discarded.
+        """
+        if candidates <= 1:
+            return self.enhance_with_groq(resume_text)
+        key = self._best_of_key(resume_text, candidates, job_description)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        formatted_prompt = self.prompt.format(resume_text=resume_text)
+        expires = None if deadline is None else time.monotonic() + deadline
+        best: Optional[Tuple[int, str]] = None
+        error = None
+        executor = ThreadPoolExecutor(max_workers=candidates, thread_name_prefix="enhance-candidate")
+        # Each call runs in a copy of this context so its tokens land on the current span
+        pending = {executor.submit(contextvars.copy_context().run, self.gateway.invoke, self.llm, formatted_prompt)
+                   for _ in range(candidates)}
+        try:
+            while pending:
+                timeout = None if expires is None or best is None else max(0.0, expires - time.monotonic())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    best = self._better(best, future.result().content.strip(), job_description)
+                if self._settled(best, target_score, expires, time.monotonic()):
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return self._store_best(key, best, error, candidates - len(pending))
+
+    async def aenhance_best_of(self, resume_text: str, candidates: int = 3, job_description: str = "",
+                               target_score: Optional[int] = None, deadline: Optional[float] = None) -> str:
+        """Async variant of enhance_best_of that cancels the calls it stops waiting for"""
+        if candidates <= 1:
+            return await self.aenhance_with_groq(resume_text)
+        key = self._best_of_key(resume_text, candidates, job_description)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        formatted_prompt = self.prompt.format(resume_text=resume_text)
+        loop = asyncio.get_running_loop()
+        expires = None if deadline is None else loop.time() + deadline
+        best: Optional[Tuple[int, str]] = None
+        error = None
+        pending = {asyncio.ensure_future(self.gateway.ainvoke(self.llm, formatted_prompt)) for _ in range(candidates)}
+        try:
+            while pending:
+                timeout = None if expires is None or best is None else max(0.0, expires - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    best = self._better(best, task.result().content.strip(), job_description)
+                if self._settled(best, target_score, expires, loop.time()):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        return self._store_best(key, best, error, candidates - len(pending))
+
+    @staticmethod
+    def _better(best: Optional[Tuple[int, str]], enhanced: str, job_description: str) -> Tuple[int, str]:
+        score = ATSScorer.calculate_score(enhanced, job_description)['score']
+        return (score, enhanced) if best is None or score > best[0] else best
+
+    @staticmethod
+    def _settled(best: Optional[Tuple[int, str]], target_score: Optional[int],
+                 expires: Optional[float], now: float) -> bool:
+        if best is None:
+            return False
+        return (target_score is not None and best[0] >= target_score) or (expires is not None and now >= expires)
+
+    def _store_best(self, key: str, best: Optional[Tuple[int, str]], error: Optional[BaseException],
+                    finished: int) -> str:
+        if best is None:
+            # Every candidate failed
+            raise error
+        tracer = get_tracer()
+        tracer.add('enhance.candidates', finished)
+        span = tracer.current()
+        if span is not None:
+            span.set('enhance.best_score', best[0])
+        self._store_text(key, best[1])
+        return best[1]
+
+    def enhance_structured(self, resume_text: str) -> EnhancedResume:
+        """Enhance and structure a resume in a single LLM call.
+
+        Raises ValueError when the model's output does not validate against
+        EnhancedResume, so callers can fall back to the two-call path.
+        """
+        key = self._cache_key(resume_text, structured=True)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return EnhancedResume(**cached)
+        formatted_prompt = self.structured_prompt.format(resume_text=resume_text)
+        structured = self._check_structured(self.gateway.invoke(self.structured_llm, formatted_prompt))
+        if self.cache is not None:
+            self.cache.set(key, structured.model_dump())
+        return structured
+
+    async def aenhance_structured(self, resume_text: str) -> EnhancedResume:
+        """Async variant of enhance_structured"""
+        key = self._cache_key(resume_text, structured=True)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return EnhancedResume(**cached)
+        formatted_prompt = self.structured_prompt.format(resume_text=resume_text)
+        structured = self._check_structured(await self.gateway.ainvoke(self.structured_llm, formatted_prompt))
+        if self.cache is not None:
+            self.cache.set(key, structured.model_dump())
+        return structured
+
+    @staticmethod
+    def _check_structured(result) -> EnhancedResume:
+        # Tool-calling models may answer in prose instead of calling the schema tool
+        if not isinstance(result, EnhancedResume):
+            raise ValueError("Model did not return an EnhancedResume")
+        return result
+
+    def stream_enhance(self, resume_text: str) -> Iterator[str]:
+        """Yield the enhanced resume text chunk by chunk as the model produces it"""
+        key = self._cache_key(resume_text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            yield cached
+            return
         formatted_prompt = self.prompt.format(resume_text=resume_text)
-        response = self.llm.invoke(formatted_prompt)
-        return response.content.strip()
\ No newline at end of file
+        chunks = []
+        for chunk in self.gateway.stream(self.llm, formatted_prompt):
+            chunks.append(chunk.content)
+            yield chunk.content
+        self._store_text(key, "".join(chunks).strip())
+
+    async def astream_enhance(self, resume_text: str) -> AsyncIterator[str]:
+        """Async variant of stream_enhance"""
+        key = self._cache_key(resume_text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            yield cached
+            return
+        formatted_prompt = self.prompt.format(resume_text=resume_text)
+        chunks = []
+        async for chunk in self.gateway.astream(self.llm, formatted_prompt):
+            chunks.append(chunk.content)
+            yield chunk.content
+        self._store_text(key, "".join(chunks).strip())
+
+    def enhance_incremental(self, resume_text: str) -> str:
+        """Enhance only the sections that are new or changed since an earlier enhancement.
+
+        Each section is fingerprinted and looked up in the cache. Sections
+        produced by an earlier enhancement map to themselves, so re-enhancing
+        an edited resume sends just the edited sections to the LLM. Text with
+        no recognised sections is enhanced whole.
+        """
+        sections = split_sections(resume_text)
+        if len(sections) < 2:
+            return self.enhance_with_groq(resume_text)
+        enhanced = [self._cached_section(section) for section in sections]
+        for i, section in enumerate(sections):
+            if enhanced[i] is None:
+                response = self.gateway.invoke(self.llm, self.section_prompt.format(section_text=section))
+                enhanced[i] = self._store_section(section, response.content.strip())
+        return "\n\n".join(enhanced)
+
+    async def aenhance_incremental(self, resume_text: str) -> str:
+        """Async variant of enhance_incremental, enhancing changed sections concurrently"""
+        sections = split_sections(resume_text)
+        if len(sections) < 2:
+            return await self.aenhance_with_groq(resume_text)
+        enhanced = [self._cached_section(section) for section in sections]
+        changed = [i for i, section in enumerate(enhanced) if section is None]
+        responses = await asyncio.gather(*(
+            self.gateway.ainvoke(self.llm, self.section_prompt.format(section_text=sections[i])) for i in changed
+        ))
+        for i, response in zip(changed, responses):
+            enhanced[i] = self._store_section(sections[i], response.content.strip())
+        return "\n\n".join(enhanced)
+
+    def enhance_chunked(self, resume_text: str, max_chars: int = CHUNK_MAX_CHARS) -> str:
+        """Enhance a long resume as concurrent chunks split along section boundaries.
+
+        Output time grows with length, so latency follows the longest chunk
+        instead of the whole document, and no prompt risks truncation. The
+        chunks are merged back in order by ``merge_chunks``.
+        """
+        key = self._chunked_key(resume_text, max_chars)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        chunks = chunk_sections(resume_text, max_chars)
+        if len(chunks) < 2:
+            return self.enhance_with_groq(resume_text)
+        enhanced = [self._cached_chunk(chunk) for chunk in chunks]
+        changed = [i for i, chunk in enumerate(enhanced) if chunk is None]
+        if changed:
+            with ThreadPoolExecutor(max_workers=len(changed), thread_name_prefix="enhance-chunk") as executor:
+                # Each call runs in a copy of this context so its tokens land on the current span
+                futures = [executor.submit(contextvars.copy_context().run, self.gateway.invoke, self.llm,
+                                           self.chunk_prompt.format(chunk_text=chunks[i])) for i in changed]
+                for i, future in zip(changed, futures):
+                    enhanced[i] = self._store_chunk(chunks[i], future.result().content.strip())
+        return self._store_chunked(key, chunks, enhanced)
+
+    async def aenhance_chunked(self, resume_text: str, max_chars: int = CHUNK_MAX_CHARS,
+                               on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Async variant of enhance_chunked.
+
+        ``on_chunk`` receives each chunk's cleaned-up text, in document order,
+        as soon as that chunk and all before it are enhanced, so a UI can show
+        progress before the merge. Their concatenation differs from the merged
+        result at most in the bullet markers.
+        """
+        key = self._chunked_key(resume_text, max_chars)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            if on_chunk is not None:
+                on_chunk(cached)
+            return cached
+        chunks = chunk_sections(resume_text, max_chars)
+        if len(chunks) < 2:
+            if on_chunk is None:
+                return await self.aenhance_with_groq(resume_text)
+            # A single chunk is streamed token by token like an unchunked enhancement
+            parts = []
+            async for part in self.astream_enhance(resume_text):
+                parts.append(part)
+                on_chunk(part)
+            return "".join(parts).strip()
+
+        enhanced = [self._cached_chunk(chunk) for chunk in chunks]
+        released = 0
+        separator = ""
+
+        def release() -> None:
+            nonlocal released, separator
+            while on_chunk is not None and released < len(chunks) and enhanced[released] is not None:
+                text = merge_chunks([chunks[released]], [enhanced[released]])
+                if text:
+                    on_chunk(separator + text)
+                    separator = "\n\n"
+                released += 1
+
+        async def enhance(i: int) -> None:
+            response = await self.gateway.ainvoke(self.llm, self.chunk_prompt.format(chunk_text=chunks[i]))
+            enhanced[i] = self._store_chunk(chunks[i], response.content.strip())
+            release()
+
+        release()
+        await asyncio.gather(*(enhance(i) for i, chunk in enumerate(enhanced) if chunk is None))
+        return self._store_chunked(key, chunks, enhanced)
+
+    def _cached_chunk(self, chunk: str) -> Optional[str]:
+        return self.cache.get(self._chunk_key(chunk)) if self.cache is not None else None
+
+    def _store_chunk(self, chunk: str, enhanced: str) -> str:
+        if self.cache is not None:
+            self.cache.set(self._chunk_key(chunk), enhanced)
+        return enhanced
+
+    def _store_chunked(self, key: str, chunks: List[str], enhanced: List[str]) -> str:
+        span = get_tracer().current()
+        if span is not None:
+            span.set('enhance.chunks', len(chunks))
+        merged = merge_chunks(chunks, enhanced)
+        self._store_text(key, merged)
+        return merged
+
+    def _store_text(self, key: str, enhanced: str) -> None:
+        """Cache a full enhancement and mark its sections as already enhanced"""
+        if self.cache is None:
+            return
+        self.cache.set(key, enhanced)
+        for section in split_sections(enhanced):
+            self.cache.set(self._section_key(section), section)
+
+    def _cached_section(self, section: str) -> Optional[str]:
+        return self.cache.get(self._section_key(section)) if self.cache is not None else None
+
+    def _store_section(self, section: str, enhanced: str) -> str:
+        if self.cache is not None:
+            self.cache.set(self._section_key(section), enhanced)
+            # Re-enhancing the output unchanged should be a no-op
+            self.cache.set(self._section_key(enhanced), enhanced)
+        return enhanced
+
+    def _section_key(self, section: str) -> str:
+        # Fingerprint ignores trailing whitespace so text_area round trips still match
+        fingerprint = "\n".join(line.rstrip() for line in section.strip().splitlines())
+        return ResultCache.make_key("enhance_section", self.section_prompt.template,
+                                    self.model_name, self.temperature, fingerprint)
+
+    def _chunk_key(self, chunk: str) -> str:
+        return ResultCache.make_key("enhance_chunk", self.chunk_prompt.template, self.model_name, self.temperature, chunk)
+
+    def _chunked_key(self, resume_text: str, max_chars: int) -> str:
+        return ResultCache.make_key("enhance_chunked", self.chunk_prompt.template, self.model_name, self.temperature,
+                                    max_chars, resume_text)
+
+    def _best_of_key(self, resume_text: str, candidates: int, job_description: str) -> str:
+        # Candidates are ranked against the job description, so it is part of the key
+        return ResultCache.make_key("enhance_best_of", self.prompt.template, self.model_name, self.temperature,
+                                    candidates, job_description, resume_text)
+
+    def _cache_key(self, resume_text: str, structured: bool = False) -> str:
+        if structured:
+            return ResultCache.make_key("enhance_structured", self.structured_prompt.template,
+                                        self.model_name, self.temperature, resume_text)
+        return ResultCache.make_key("enhance", self.prompt.template, self.model_name, self.temperature, resume_text)
\ No newline at end of file
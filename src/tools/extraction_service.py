@@ -1,21 +1,125 @@
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from dotenv import load_dotenv
 from pydantic_objects import EnhancedResume
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 import json
 import re
 
+from src.parsers.parser import section_for_heading, text_sections
+from src.parsers.section_extractor import EXTRACTOR_VERSION, resolved_fields
+from src.tools.cache_service import ResultCache
+from src.tools.llm_gateway import LLMGateway, LazyChatModel, get_gateway
+from src.tools.tracing_service import get_tracer
+
+# Validators for each top-level EnhancedResume field, so sections can be
+# checked independently as soon as they arrive
+FIELD_ADAPTERS = {name: TypeAdapter(field.annotation) for name, field in EnhancedResume.model_fields.items()}
+
+# JSON shape of each field, used when re-requesting only some sections
+FIELD_FORMATS = {
+    "personal_info": '{"name": "", "email": "", "phone": "", "location": ""}',
+    "summary": '""',
+    "education": '[{"degree": "", "institution": "", "year": ""}]',
+    "skills": '[]',
+    "experience": '[{"title": "", "company": "", "duration": "", "description": ""}]',
+    "projects": '[{"name": "", "description": ""}]',
+}
+
+# List sections that can be skipped when the original resume has no such section.
+# The summary is excluded because enhancement often writes one without a heading.
+HINTED_FIELDS = ('education', 'experience', 'projects', 'skills')
+
+MEMBER_KEY_PATTERN = re.compile(r'^\s*"((?:[^"\\]|\\.)*)"\s*:')
+
+
+class IncrementalObjectParser:
+    """Scans a streamed JSON object and emits each top-level member once it closes.
+
+    Anything before the opening brace (code fences, preamble) is skipped. A
+    member that is not valid JSON is emitted with a ValueError as its value,
+    so one bad section does not invalidate the others.
+    """
+
+    def __init__(self):
+        self._member: List[str] = []
+        self._depth = 0
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        members = []
+        for ch in chunk:
+            if self._done:
+                break
+            if not self._started:
+                if ch == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+            if self._in_string:
+                self._member.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._done = True
+                    members.extend(self._flush())
+                    continue
+            elif ch == ',' and self._depth == 1:
+                members.extend(self._flush())
+                continue
+            self._member.append(ch)
+        return members
+
+    def _flush(self) -> List[Tuple[str, Any]]:
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return []
+        try:
+            return list(json.loads("{" + text + "}").items())
+        except json.JSONDecodeError as e:
+            key = MEMBER_KEY_PATTERN.match(text)
+            return [(key.group(1), ValueError(f"invalid JSON: {e}"))] if key else []
+
 
 class ResumeExtractor:
-    def __init__(self, resume_text: str):
-        load_dotenv()
+    llm = LazyChatModel()
+
+    def __init__(self, resume_text: str, cache: Optional[ResultCache] = None,
+                 gateway: Optional[LLMGateway] = None, sections: Optional[Iterable[str]] = None,
+                 heuristics: bool = True):
         self.resume_text = resume_text
-        print(resume_text)
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0
-        )
+        # Section hints from the parser: list sections missing from both the
+        # original and the enhanced text are filled in empty instead of requested.
+        # Without any detected heading there is nothing to go on, and a Title Case
+        # line naming the section (which detection skips) still counts as present
+        self.absent: List[str] = []
+        sections = list(sections or [])
+        if sections:
+            present = set(sections) | {section['name'] for section in text_sections(resume_text)}
+            present |= {section_for_heading(line) for line in resume_text.split("\n")}
+            self.absent = [name for name in HINTED_FIELDS if name not in present]
+        # Fields the rule-based section extractor resolved confidently are not requested
+        self.local_fields, self.confidence = resolved_fields(resume_text) if heuristics else ({}, {})
+        self.model_name = "llama-3.3-70b-versatile"
+        self.temperature = 0
+        self.cache = cache
+        self.gateway = gateway or get_gateway()
+        # Validation errors of the most recent attempt, per field
+        self.field_errors: Dict[str, str] = {}
+        from langchain_core.prompts import PromptTemplate
         self.prompt = PromptTemplate(
             input_variables=["resume_text"],
             template="""
@@ -51,20 +155,119 @@ IMPORTANT: Return ONLY valid JSON. No markdown, no code blocks, no commentary.
         )
 
     def extraction(self):
+        """Extract EnhancedResume, re-requesting only the sections that came back invalid"""
+        cached = self._cached()
+        if cached is not None:
+            return cached
         try:
-            formatted_prompt = self.prompt.format(resume_text=self.resume_text)
-            response = self.llm.invoke(formatted_prompt)
-            result = response.content.strip()
-            result = re.sub(r'```json\s*', '', result)
-            result = re.sub(r'```\s*', '', result)
-            result = result.strip()
-            parsed_json = json.loads(result)
-            validated = EnhancedResume(**parsed_json)
-            return validated
+            fields = self._prefilled()
+            if len(fields) < len(FIELD_ADAPTERS):
+                fields.update(self.stream_fields(self._requested(fields)))
+            missing = self._missing(fields)
+            if missing:
+                fields.update(self.stream_fields(missing))
+            return self._store(self._assemble(fields))
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f" Error during extraction: {e}")
 
-        except json.JSONDecodeError as e:
-            raise ValueError(f" Model did not return valid JSON. Error: {e}\nResponse: {result[:200]}")
-        except ValidationError as e:
-            raise ValueError(f" Parsed data did not match EnhancedResume schema:\n{e}")
+    async def aextraction(self):
+        """Async variant of extraction"""
+        cached = self._cached()
+        if cached is not None:
+            return cached
+        try:
+            fields = self._prefilled()
+            if len(fields) < len(FIELD_ADAPTERS):
+                fields.update({key: value async for key, value in self.astream_fields(self._requested(fields))})
+            missing = self._missing(fields)
+            if missing:
+                fields.update({key: value async for key, value in self.astream_fields(missing)})
+            return self._store(self._assemble(fields))
+        except ValueError:
+            raise
         except Exception as e:
-            raise RuntimeError(f" Error during extraction: {e}")
\ No newline at end of file
+            raise RuntimeError(f" Error during extraction: {e}")
+
+    def stream_fields(self, fields: Optional[List[str]] = None) -> Iterator[Tuple[str, Any]]:
+        """Yield (field, value) pairs as each top-level field closes and validates.
+
+        Lets callers such as the renderer start on completed sections before
+        the whole response has arrived. With ``fields`` only those sections are
+        requested.
+        """
+        parser = IncrementalObjectParser()
+        for chunk in self.gateway.stream(self.llm, self._prompt_for(fields)):
+            yield from self._validated(parser.feed(chunk.content), fields)
+
+    async def astream_fields(self, fields: Optional[List[str]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Async variant of stream_fields"""
+        parser = IncrementalObjectParser()
+        async for chunk in self.gateway.astream(self.llm, self._prompt_for(fields)):
+            for key, value in self._validated(parser.feed(chunk.content), fields):
+                yield key, value
+
+    def _prefilled(self) -> Dict[str, Any]:
+        """Fields known without the LLM: absent sections and confident local extractions"""
+        fields = {name: [] for name in self.absent}
+        fields.update(self._validated(self.local_fields.items(), None))
+        get_tracer().add('extract.local_fields', len(fields))
+        return fields
+
+    def _requested(self, fields: Dict[str, Any]) -> Optional[List[str]]:
+        """Fields for the first request, or None for the full extraction prompt"""
+        if not fields:
+            return None
+        return self._missing(fields)
+
+    def _prompt_for(self, fields: Optional[List[str]]) -> str:
+        if fields is None:
+            return self.prompt.format(resume_text=self.resume_text)
+        shape = ",\n".join(f'  "{name}": {FIELD_FORMATS[name]}' for name in fields)
+        return (
+            "You are an intelligent resume parsing assistant.\n\n"
+            "Extract ONLY the following fields from the resume text and output them as a valid "
+            f"JSON object strictly matching this format:\n\n{{\n{shape}\n}}\n\n"
+            f"Resume:\n{self.resume_text}\n\n"
+            "IMPORTANT: Return ONLY valid JSON. No markdown, no code blocks, no commentary."
+        )
+
+    def _validated(self, members: Iterable[Tuple[str, Any]], fields: Optional[List[str]]) -> Iterator[Tuple[str, Any]]:
+        for key, value in members:
+            if key not in FIELD_ADAPTERS or (fields is not None and key not in fields):
+                continue
+            if isinstance(value, ValueError):
+                self.field_errors[key] = str(value)
+                continue
+            try:
+                yield key, FIELD_ADAPTERS[key].validate_python(value)
+                self.field_errors.pop(key, None)
+            except ValidationError as e:
+                self.field_errors[key] = str(e)
+
+    @staticmethod
+    def _missing(fields: Dict[str, Any]) -> List[str]:
+        return [name for name in FIELD_ADAPTERS if name not in fields]
+
+    def _assemble(self, fields: Dict[str, Any]) -> EnhancedResume:
+        missing = self._missing(fields)
+        if missing:
+            details = "; ".join(f"{name}: {self.field_errors.get(name, 'missing')}" for name in missing)
+            raise ValueError(f" Parsed data did not match EnhancedResume schema: {details}")
+        return EnhancedResume(**fields)
+
+    def _cache_key(self) -> str:
+        return ResultCache.make_key("extract", self.prompt.template, self.model_name, self.temperature,
+                                    self.resume_text, self.absent, EXTRACTOR_VERSION, sorted(self.local_fields))
+
+    def _cached(self) -> Optional[EnhancedResume]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key())
+        return EnhancedResume(**cached) if cached is not None else None
+
+    def _store(self, validated: EnhancedResume) -> EnhancedResume:
+        if self.cache is not None:
+            self.cache.set(self._cache_key(), validated.model_dump())
+        return validated
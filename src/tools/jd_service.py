@@ -0,0 +1,102 @@
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import copy
+import math
+import re
+
+# Keeps technical tokens such as c++, c#, node.js and ci/cd intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+during each either etc for from has have having he her how i if in including into is it its may more
+most must of on or other our over per should so such than that the their them then there these they
+this those through to under up us using via was we well were what when where which while who will
+with within would you your able strong experience experiences work working years year role team plus
+""".split())
+# Covering this share of the weighted job description vocabulary earns full keyword marks
+FULL_MARKS_COVERAGE = 0.6
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split and drop stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def extract_terms(text: str) -> Set[str]:
+    """Unigrams and adjacent bigrams of a document, as a set for O(1) lookups"""
+    tokens = tokenize(text)
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+class JobDescriptionIndex:
+    """A job description tokenized once into weighted unigram and bigram terms.
+
+    Resumes are matched with a sparse lookup of the index terms in the resume's
+    term set, so ranking many applicants never re-tokenizes the posting.
+    """
+
+    def __init__(self, job_description: str, idf: Optional[Dict[str, float]] = None):
+        tokens = tokenize(job_description)
+        self.term_counts = Counter(tokens)
+        self.term_counts.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        self.weights: Dict[str, float] = {}
+        self.total_weight = 0.0
+        self.reweight(idf or {})
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def for_text(job_description: str) -> "JobDescriptionIndex":
+        """Cached index for a raw job description string"""
+        return JobDescriptionIndex(job_description)
+
+    def reweight(self, idf: Dict[str, float]) -> None:
+        """Recompute TF-IDF weights; terms missing from idf keep a weight of 1"""
+        self.weights = {
+            term: (1 + math.log(count)) * idf.get(term, 1.0)
+            for term, count in self.term_counts.items()
+        }
+        self.total_weight = sum(self.weights.values())
+
+    def fit(self, resume_term_sets: Iterable[Set[str]]) -> "JobDescriptionIndex":
+        """Return a copy weighted by smoothed IDF over an applicant pool's term sets"""
+        term_sets = list(resume_term_sets)
+        document_frequency = Counter()
+        for terms in term_sets:
+            document_frequency.update(term for term in self.term_counts if term in terms)
+        n = len(term_sets)
+        fitted = copy.copy(self)
+        fitted.reweight({
+            term: math.log((1 + n) / (1 + document_frequency[term])) + 1
+            for term in self.term_counts
+        })
+        return fitted
+
+    def coverage(self, resume_terms: Set[str]) -> float:
+        """Weighted share of the job description terms present in the resume"""
+        if not self.total_weight:
+            return 0.0
+        matched = sum(weight for term, weight in self.weights.items() if term in resume_terms)
+        return matched / self.total_weight
+
+    def score(self, resume_text: str) -> int:
+        """Keyword points (0-20) for a resume against this job description"""
+        coverage = self.coverage(extract_terms(resume_text))
+        return min(int(coverage / FULL_MARKS_COVERAGE * 20), 20)
+
+    def missing_terms(self, resume_text: str, limit: int = 10) -> List[str]:
+        """Highest-weighted job description terms the resume does not mention"""
+        resume_terms = extract_terms(resume_text)
+        missing = [term for term in self.weights if term not in resume_terms]
+        return sorted(missing, key=self.weights.get, reverse=True)[:limit]
+
+    def rank(self, resume_texts: Iterable[str], fit_idf: bool = True) -> List[Tuple[int, float]]:
+        """Rank resumes by coverage, best first, as (index, coverage) pairs.
+
+        Each resume is tokenized exactly once; with fit_idf the pool itself
+        supplies the IDF weights, so terms every applicant mentions count less.
+        """
+        term_sets = [extract_terms(text) for text in resume_texts]
+        index = self.fit(term_sets) if fit_idf else self
+        ranked = [(i, index.coverage(terms)) for i, terms in enumerate(term_sets)]
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
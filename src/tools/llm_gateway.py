@@ -0,0 +1,566 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+import asyncio
+import math
+import os
+import random
+import threading
+import time
+
+from src.tools.tracing_service import get_tracer
+
+# Caller-imposed cap on concurrent async calls in this context, on top of the gateway's own limit
+_call_permits: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("llm_call_permits", default=None)
+
+
+@contextmanager
+def call_permits(semaphore: asyncio.Semaphore) -> Iterator[None]:
+    """Make every async LLM call started in this context, including from tasks it spawns, hold a permit"""
+    token = _call_permits.set(semaphore)
+    try:
+        yield
+    finally:
+        _call_permits.reset(token)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when the provider keeps answering 429 after all retries"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    ``reserve`` deducts immediately and returns how long the caller must wait
+    before the reservation is covered, so sync and async callers can share one
+    bucket without polling.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def adjust(self, amount: float) -> None:
+        """Return (positive) or charge (negative) tokens after the real cost is known"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit shared by sync and async callers.
+
+    The limit grows by roughly one slot per window of successful, fast calls and
+    shrinks multiplicatively on slow calls or 429s.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 target_latency: float = 10.0, backoff: float = 0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        return max(self.minimum, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._cond:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+                raise
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._wake()
+
+    def on_success(self, latency: float) -> None:
+        with self._cond:
+            if latency > self.target_latency:
+                self._decrease()
+            else:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            self._wake()
+
+    def on_rate_limited(self) -> None:
+        with self._cond:
+            self._decrease()
+
+    def _decrease(self) -> None:
+        # One decrease per latency window, so a burst of failures from the
+        # same window does not collapse the limit to the floor
+        now = time.monotonic()
+        if now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.minimum), self._limit * self.backoff)
+
+    def _wake(self) -> None:
+        self._cond.notify_all()
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """Rough token count for a prompt (about four characters per token)"""
+    return max(1, math.ceil(len(str(prompt)) / 4))
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    return _status_code(error) == 429 or type(error).__name__ == 'RateLimitError'
+
+
+def is_bad_request(error: Exception) -> bool:
+    """Whether the provider rejected a request with 400, e.g. "tool_use_failed" when output misses a schema tool"""
+    return _status_code(error) == 400 or type(error).__name__ == 'BadRequestError'
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """Single choke point for every LLM call in the process.
+
+    Enforces requests/min and tokens/min budgets with token buckets, adapts
+    concurrency with AIMD, and retries 429s with jittered backoff. Works with
+    any LangChain runnable, so it can be exercised with a local fake chat model.
+    """
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: float = 12000,
+                 max_retries: int = 4, completion_ratio: float = 1.0,
+                 concurrency: Optional[AdaptiveConcurrency] = None):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.concurrency = concurrency or AdaptiveConcurrency()
+        self.max_retries = max_retries
+        # Completions are charged up front as a fraction of the prompt size,
+        # then reconciled with the provider's usage report
+        self.completion_ratio = completion_ratio
+        self._stats = {'calls': 0, 'rate_limited': 0, 'retries': 0}
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats, concurrency_limit=self.concurrency.limit, in_flight=self.concurrency.in_flight)
+
+    def invoke(self, llm: Any, prompt: Any, **kwargs) -> Any:
+        estimated = self._estimate(prompt)
+        for attempt in range(self.max_retries + 1):
+            self.concurrency.acquire()
+            try:
+                time.sleep(self._budget_wait(estimated))
+                started = time.monotonic()
+                response = llm.invoke(prompt, **kwargs)
+            except Exception as e:
+                delay = self._handle_error(e, attempt, estimated)
+            else:
+                self._handle_success(getattr(response, 'usage_metadata', None), started, estimated)
+                return response
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+        raise RateLimitExceeded("LLM provider rate limit persisted after retries")
+
+    async def ainvoke(self, llm: Any, prompt: Any, **kwargs) -> Any:
+        estimated = self._estimate(prompt)
+        permits = _call_permits.get()
+        for attempt in range(self.max_retries + 1):
+            await self._aacquire(permits)
+            try:
+                await asyncio.sleep(self._budget_wait(estimated))
+                started = time.monotonic()
+                response = await llm.ainvoke(prompt, **kwargs)
+            except Exception as e:
+                delay = self._handle_error(e, attempt, estimated)
+            else:
+                self._handle_success(getattr(response, 'usage_metadata', None), started, estimated)
+                return response
+            finally:
+                self._arelease(permits)
+            await asyncio.sleep(delay)
+        raise RateLimitExceeded("LLM provider rate limit persisted after retries")
+
+    def stream(self, llm: Any, prompt: Any, **kwargs) -> Iterator[Any]:
+        """Stream chunks under the same budgets; 429s are retried only before the first chunk"""
+        estimated = self._estimate(prompt)
+        for attempt in range(self.max_retries + 1):
+            self.concurrency.acquire()
+            streamed = False
+            usage = None
+            try:
+                time.sleep(self._budget_wait(estimated))
+                started = time.monotonic()
+                for chunk in llm.stream(prompt, **kwargs):
+                    streamed = True
+                    usage = getattr(chunk, 'usage_metadata', None) or usage
+                    yield chunk
+            except Exception as e:
+                if streamed:
+                    raise
+                delay = self._handle_error(e, attempt, estimated)
+            else:
+                self._handle_success(usage, started, estimated)
+                return
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+        raise RateLimitExceeded("LLM provider rate limit persisted after retries")
+
+    async def astream(self, llm: Any, prompt: Any, **kwargs) -> AsyncIterator[Any]:
+        estimated = self._estimate(prompt)
+        permits = _call_permits.get()
+        for attempt in range(self.max_retries + 1):
+            await self._aacquire(permits)
+            streamed = False
+            usage = None
+            try:
+                await asyncio.sleep(self._budget_wait(estimated))
+                started = time.monotonic()
+                async for chunk in llm.astream(prompt, **kwargs):
+                    streamed = True
+                    usage = getattr(chunk, 'usage_metadata', None) or usage
+                    yield chunk
+            except Exception as e:
+                if streamed:
+                    raise
+                delay = self._handle_error(e, attempt, estimated)
+            else:
+                self._handle_success(usage, started, estimated)
+                return
+            finally:
+                self._arelease(permits)
+            await asyncio.sleep(delay)
+        raise RateLimitExceeded("LLM provider rate limit persisted after retries")
+
+    async def _aacquire(self, permits: Optional[asyncio.Semaphore]) -> None:
+        if permits is None:
+            await self.concurrency.aacquire()
+            return
+        await permits.acquire()
+        try:
+            await self.concurrency.aacquire()
+        except BaseException:
+            permits.release()
+            raise
+
+    def _arelease(self, permits: Optional[asyncio.Semaphore]) -> None:
+        self.concurrency.release()
+        if permits is not None:
+            permits.release()
+
+    def _estimate(self, prompt: Any) -> int:
+        prompt_tokens = estimate_tokens(prompt)
+        return prompt_tokens + int(prompt_tokens * self.completion_ratio)
+
+    def _budget_wait(self, estimated: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated))
+
+    def _handle_success(self, usage: Optional[Dict[str, Any]], started: float, estimated: int) -> None:
+        self._stats['calls'] += 1
+        self.concurrency.on_success(time.monotonic() - started)
+        # Token counts land on whichever pipeline stage made the call
+        tracer = get_tracer()
+        tracer.add('llm.calls')
+        if usage:
+            tracer.add('llm.prompt_tokens', usage.get('input_tokens', 0))
+            tracer.add('llm.completion_tokens', usage.get('output_tokens', 0))
+        actual = (usage or {}).get('total_tokens')
+        if actual is not None:
+            self.tokens.adjust(estimated - actual)
+
+    def _handle_error(self, error: Exception, attempt: int, estimated: int) -> float:
+        """Decide how long to back off before retrying, or re-raise"""
+        if not _is_rate_limited(error):
+            # The call never produced tokens, so give the budget back
+            self.tokens.adjust(estimated)
+            raise error
+        self._stats['rate_limited'] += 1
+        get_tracer().add('llm.rate_limited')
+        self.concurrency.on_rate_limited()
+        if attempt >= self.max_retries:
+            raise RateLimitExceeded("LLM provider rate limit persisted after retries") from error
+        self._stats['retries'] += 1
+        self.tokens.adjust(estimated)
+        delay = _retry_after(error) or min(30.0, 2 ** attempt)
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return random.uniform(delay / 2, delay)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Process-wide gateway shared by every service that talks to the LLM"""
+    global _gateway
+    load_env()
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                requests_per_minute=float(os.getenv('GROQ_REQUESTS_PER_MINUTE', 30)),
+                tokens_per_minute=float(os.getenv('GROQ_TOKENS_PER_MINUTE', 12000))
+            )
+        return _gateway
+
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load .env once per process"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _http_options() -> Dict[str, Any]:
+    """Pool settings shared by every Groq HTTP client.
+
+    Idle connections are kept for a minute (httpx drops them after 5s), so
+    consecutive stages and runs skip the TCP/TLS handshake. HTTP/2, which
+    multiplexes concurrent calls over one connection, needs the h2 package.
+    """
+    import httpx
+    try:
+        import h2  # noqa: F401
+        http2 = os.getenv('GROQ_HTTP2', '1') != '0'
+    except ImportError:
+        http2 = False
+    return {
+        'http2': http2,
+        'limits': httpx.Limits(
+            # Matches the gateway's concurrency ceiling, so calls never queue for a connection
+            max_connections=int(os.getenv('GROQ_MAX_CONNECTIONS', 32)),
+            max_keepalive_connections=int(os.getenv('GROQ_MAX_KEEPALIVE', 16)),
+            keepalive_expiry=float(os.getenv('GROQ_KEEPALIVE_EXPIRY', 60))
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def _groq_client() -> Tuple[Any, Any]:
+    """Process-wide Groq SDK client and its pooled HTTP client, used by every sync call"""
+    import groq
+    load_env()
+    http_client = groq.DefaultHttpxClient(**_http_options())
+    # Retries are owned by the gateway so 429s do not fan out into retry storms.
+    # The base URL comes from GROQ_BASE_URL, e.g. a local OpenAI-compatible mock
+    return groq.Groq(max_retries=0, http_client=http_client), http_client
+
+
+# Async connections belong to the event loop that opened them, so one long-lived
+# loop owns them all and calls from short-lived loops (one asyncio.run per
+# Streamlit click or batch run) are handed over to it
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_client_loop_lock = threading.Lock()
+
+
+def _get_client_loop() -> asyncio.AbstractEventLoop:
+    global _client_loop
+    with _client_loop_lock:
+        if _client_loop is None:
+            _client_loop = asyncio.new_event_loop()
+            threading.Thread(target=_client_loop.run_forever, name="llm-client-loop", daemon=True).start()
+        return _client_loop
+
+
+async def _on_client_loop(coro) -> Any:
+    """Await a coroutine on the client loop; cancelling the caller cancels it there too"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _get_client_loop()))
+
+
+@lru_cache(maxsize=None)
+def _async_groq_client() -> Tuple[Any, Any]:
+    """Process-wide AsyncGroq client and its pooled HTTP client; only used on the client loop"""
+    import groq
+    load_env()
+    http_client = groq.DefaultAsyncHttpxClient(**_http_options())
+    return groq.AsyncGroq(max_retries=0, http_client=http_client), http_client
+
+
+async def _create(kwargs: Dict[str, Any]) -> Any:
+    return await _async_groq_client()[0].chat.completions.create(**kwargs)
+
+
+async def _next_chunk(stream) -> Tuple[bool, Any]:
+    # StopAsyncIteration cannot cross the thread-safe future, so it becomes a flag
+    try:
+        return False, await stream.__anext__()
+    except StopAsyncIteration:
+        return True, None
+
+
+class _ClientLoopStream:
+    """Async iterator over a streamed completion whose connection lives on the client loop.
+
+    The connection goes back to the pool as soon as the stream ends, fails, is
+    cancelled (e.g. a best-of-N early exit) or is dropped unfinished.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            done, chunk = await _on_client_loop(_next_chunk(self._stream))
+        except BaseException:
+            self._close_soon()
+            raise
+        if done:
+            self._closed = True
+            raise StopAsyncIteration
+        return chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await _on_client_loop(self._stream.close())
+
+    close = aclose
+
+    def _close_soon(self) -> None:
+        """Close on the client loop without waiting, e.g. from a cancelled task"""
+        if not self._closed:
+            self._closed = True
+            asyncio.run_coroutine_threadsafe(self._stream.close(), _get_client_loop())
+
+    def __del__(self):
+        # LangChain stops iterating without closing, so an abandoned stream is closed when dropped
+        self._close_soon()
+
+
+class _ClientLoopCompletions:
+    """Stands in for ``AsyncGroq().chat.completions``, running each call on the client loop"""
+
+    async def create(self, **kwargs) -> Any:
+        response = await _on_client_loop(_create(kwargs))
+        return _ClientLoopStream(response) if kwargs.get('stream') else response
+
+
+def warm_up() -> None:
+    """Open pooled connections for sync and async calls ahead of the first call; errors are ignored.
+
+    Blocks until both handshakes are done, so call it from a background thread.
+    """
+    warming = asyncio.run_coroutine_threadsafe(_warm_up_async(), _get_client_loop())
+    client, http_client = _groq_client()
+    try:
+        http_client.head(str(client.base_url))
+    except Exception:
+        pass
+    warming.result()
+
+
+async def _warm_up_async() -> None:
+    client, http_client = _async_groq_client()
+    try:
+        await http_client.head(str(client.base_url))
+    except Exception:
+        pass
+
+
+async def awarm_up() -> None:
+    """``warm_up`` for the pool shared by async calls"""
+    await _on_client_loop(_warm_up_async())
+
+
+@lru_cache(maxsize=None)
+def chat_model(temperature: float, model: str = DEFAULT_MODEL) -> Any:
+    """Shared ChatGroq per model and temperature, imported and built on first use.
+
+    langchain_groq and the Groq SDK account for most of the pipeline's import
+    time, so nothing imports them until an LLM call is actually made. Every
+    model shares the same pooled clients, so the stages of a run reuse
+    connections instead of reconnecting.
+    """
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model=model,
+        temperature=temperature,
+        max_retries=0,
+        client=_groq_client()[0].chat.completions,
+        async_client=_ClientLoopCompletions()
+    )
+
+
+class LazyChatModel:
+    """Descriptor resolving ``self.llm`` to ``chat_model(self.temperature, self.model_name)`` on first access.
+
+    Assigning the attribute (e.g. a fake chat model in tests) replaces it.
+    """
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__:
+            instance.__dict__[self.name] = chat_model(instance.temperature, instance.model_name)
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value) -> None:
+        instance.__dict__[self.name] = value
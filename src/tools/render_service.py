@@ -1,72 +1,232 @@
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, Any, FrozenSet, List, Optional, Tuple
+from xml.sax.saxutils import escape
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
+import unicodedata
 
-from src.templates.professional_template import generate_professional_docx
-from src.templates.modern_template import generate_modern_docx
-from src.templates.academic_template import generate_academic_docx
+from src.templates.layout import Block, render_docx
+from src.templates import professional_template, modern_template, academic_template
+
+if TYPE_CHECKING:
+    from reportlab.lib.styles import ParagraphStyle
+
+# Template name -> (style spec, document tree builder, compiled DOCX base)
+TEMPLATES = {
+    "professional": (professional_template.PROFESSIONAL_SPEC, professional_template.layout_professional,
+                     professional_template.base_document),
+    "modern": (modern_template.MODERN_SPEC, modern_template.layout_modern, modern_template.base_document),
+    "academic": (academic_template.ACADEMIC_SPEC, academic_template.layout_academic, academic_template.base_document),
+}
+# ReportLab alignment constants (TA_LEFT, TA_CENTER, TA_JUSTIFY); ReportLab is imported on first PDF render
+PDF_ALIGNMENTS = {'center': 1, 'justify': 4, 'left': 0}
+# Unicode TrueType faces per (bold, italic), embedded only in PDFs with letters the standard fonts lack,
+# so that names like "Łukasz Żółć" keep every letter
+PDF_FONT_FILES = {(False, False): 'DejaVuSans.ttf', (True, False): 'DejaVuSans-Bold.ttf',
+                  (False, True): 'DejaVuSans-Oblique.ttf', (True, True): 'DejaVuSans-BoldOblique.ttf'}
+PDF_FONT_DIRS = ('/usr/share/fonts/truetype/dejavu', '/usr/share/fonts/dejavu', '/usr/share/fonts/TTF',
+                 '/usr/local/share/fonts', '/Library/Fonts', os.path.expanduser('~/Library/Fonts'))
+# Standard PDF fonts, used for cp1252 text and when no Unicode font is installed
+STANDARD_FONTS = {(False, False): 'Helvetica', (True, False): 'Helvetica-Bold',
+                  (False, True): 'Helvetica-Oblique', (True, True): 'Helvetica-BoldOblique'}
+# Glyphs outside the standard PDF fonts' encoding that have a close substitute
+PDF_GLYPHS = str.maketrans({'▸': '•', '◆': '•'})
+# Letters without a decomposition to fall back on when no Unicode font is installed
+LATIN_FALLBACKS = str.maketrans({'Ł': 'L', 'ł': 'l', 'Đ': 'D', 'đ': 'd', 'ı': 'i'})
+BASE_FONT_SIZE = 11
+
+
+def _template(template_style: str) -> str:
+    return template_style if template_style in TEMPLATES else "professional"
+
+
+@lru_cache(maxsize=None)
+def unicode_fonts() -> Optional[Tuple[Dict[Tuple[bool, bool], str], FrozenSet[int]]]:
+    """Unicode PDF font names per (bold, italic) and the code points they can draw, or None if not installed.
+
+    DejaVu Sans is registered from PDF_FONT_DIR or the usual font directories;
+    a missing bold or oblique face falls back to the closest one installed.
+    """
+    directory = next((directory for directory in (os.getenv('PDF_FONT_DIR'),) + PDF_FONT_DIRS
+                      if directory and os.path.isfile(os.path.join(directory, PDF_FONT_FILES[(False, False)]))), None)
+    if directory is None:
+        return None
+
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    names = {}
+    for style, filename in PDF_FONT_FILES.items():
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            names[style] = os.path.splitext(filename)[0]
+            pdfmetrics.registerFont(TTFont(names[style], path))
+    regular = names[(False, False)]
+    names.setdefault((True, False), regular)
+    names.setdefault((False, True), regular)
+    names.setdefault((True, True), names[(True, False)])
+    # Lets <b> and <i> run markup switch faces within the family
+    pdfmetrics.registerFontFamily(regular, normal=regular, bold=names[(True, False)],
+                                  italic=names[(False, True)], boldItalic=names[(True, True)])
+    return names, frozenset(pdfmetrics.getFont(regular).face.charToGlyph)
+
+
+def _font_name(bold: bool, italic: bool, unicode_font: bool = False) -> str:
+    return (unicode_fonts()[0] if unicode_font else STANDARD_FONTS)[(bool(bold), bool(italic))]
+
+
+def _has_unicode_letters(text: str) -> bool:
+    """Whether text has letters outside cp1252, which the standard PDF fonts cannot draw"""
+    try:
+        text.encode('cp1252')
+        return False
+    except UnicodeEncodeError:
+        return any(unicodedata.category(char).startswith('L') and not char.encode('cp1252', 'ignore')
+                   for char in text)
+
+
+def _pdf_text(text: str, covered: Optional[FrozenSet[int]] = None) -> str:
+    """Escape markup and drop glyphs (e.g. emoji) the PDF font cannot draw; covered is the Unicode font's"""
+    if covered is not None:
+        return escape(''.join(char for char in text if ord(char) in covered or char in '\n\t'))
+    text = text.translate(PDF_GLYPHS)
+    try:
+        text.encode('cp1252')
+    except UnicodeEncodeError:
+        # Letters outside cp1252 keep their base letter, e.g. "Ż" becomes "Z", instead of vanishing
+        text = ''.join(char if ord(char) < 0x100 else unicodedata.normalize('NFKD', char)
+                       for char in text.translate(LATIN_FALLBACKS))
+    return escape(text.encode('cp1252', 'ignore').decode('cp1252'))
+
+
+@lru_cache(maxsize=None)
+def pdf_stylesheet(template_style: str, unicode_font: bool = False
+                   ) -> Tuple[Dict[Any, "ParagraphStyle"], Dict[str, Tuple[str, str]], Dict[str, Any]]:
+    """ReportLab paragraph styles, run markup and bottom-rule settings compiled once per template spec and font"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import inch
+
+    spec = TEMPLATES[template_style][0]
+    paragraph_styles = {None: ParagraphStyle('Resume Normal', fontName=_font_name(False, False, unicode_font),
+                                             fontSize=BASE_FONT_SIZE, leading=BASE_FONT_SIZE * 1.2)}
+    rules = {}
+    for name, props in spec.get('paragraph', {}).items():
+        size = props.get('size', BASE_FONT_SIZE)
+        paragraph_styles[name] = ParagraphStyle(
+            name,
+            fontName=_font_name(props.get('bold'), props.get('italic'), unicode_font),
+            fontSize=size,
+            leading=size * 1.2,
+            textColor=colors.HexColor(f"#{props.get('color', '000000')}"),
+            alignment=PDF_ALIGNMENTS[props.get('align', 'left')],
+            spaceBefore=props.get('space_before', 0),
+            spaceAfter=props.get('space_after', 0),
+            leftIndent=props.get('left_indent', 0) * inch,
+            firstLineIndent=props.get('first_line_indent', 0) * inch,
+            backColor=colors.HexColor(f"#{props['shading']}") if 'shading' in props else None,
+        )
+        if 'border' in props:
+            color, size = props['border']
+            # Word border sizes are in eighths of a point
+            rules[name] = {'width': '100%', 'thickness': int(size) / 8, 'color': colors.HexColor(f"#{color}"),
+                           'spaceBefore': 1, 'spaceAfter': 2}
+
+    run_markup = {}
+    for name, props in spec.get('character', {}).items():
+        attributes = ''
+        if 'color' in props:
+            attributes += f' color="#{props["color"]}"'
+        if 'size' in props:
+            attributes += f' size="{props["size"]}"'
+        opening, closing = f'<font{attributes}>', '</font>'
+        if props.get('bold'):
+            opening, closing = opening + '<b>', '</b>' + closing
+        if props.get('italic'):
+            opening, closing = opening + '<i>', '</i>' + closing
+        run_markup[name] = (opening, closing)
+    return paragraph_styles, run_markup, rules
 
 
 class ResumeGenerator:
+    """Renders resumes in memory; writing them to output_dir is an optional sink.
+
+    Each template lays a resume out once as a document tree of styled blocks,
+    which the DOCX and ReportLab backends both consume.
+    """
+
     def __init__(self, output_dir: str = "output"):
         self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
 
-    def generate_docx(self, resume_data: Dict[str, Any], template_style: str = "professional", filename: str = "resume.docx") -> str:
-        if template_style == "modern":
-            return generate_modern_docx(resume_data, self.output_dir, filename)
-        elif template_style == "academic":
-            return generate_academic_docx(resume_data, self.output_dir, filename)
-        return generate_professional_docx(resume_data, self.output_dir, filename)
+    def layout(self, resume_data: Dict[str, Any], template_style: str = "professional") -> List[Block]:
+        return TEMPLATES[_template(template_style)][1](resume_data)
 
-    def generate_pdf(self, resume_data: Dict[str, Any], template_style: str = "professional", filename: str = "resume.pdf") -> str:
-        path = os.path.join(self.output_dir, filename)
-        doc = SimpleDocTemplate(path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
+    def render(self, resume_data: Dict[str, Any], template_style: str = "professional") -> Tuple[bytes, bytes]:
+        """Render DOCX and PDF side by side from one document tree"""
+        blocks = self.layout(resume_data, template_style)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pdf = pool.submit(self.pdf_from_layout, blocks, template_style)
+            docx = self.docx_from_layout(blocks, template_style)
+            return docx, pdf.result()
+
+    def render_docx(self, resume_data: Dict[str, Any], template_style: str = "professional") -> bytes:
+        return self.docx_from_layout(self.layout(resume_data, template_style), template_style)
+
+    def render_pdf(self, resume_data: Dict[str, Any], template_style: str = "professional") -> bytes:
+        return self.pdf_from_layout(self.layout(resume_data, template_style), template_style)
+
+    def docx_from_layout(self, blocks: List[Block], template_style: str = "professional") -> bytes:
+        buffer = BytesIO()
+        render_docx(blocks, TEMPLATES[_template(template_style)][2]()).save(buffer)
+        return buffer.getvalue()
 
-        title_color = colors.HexColor('#0066CC') if template_style == "modern" else colors.black
-        title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=20, textColor=title_color, alignment=1)
-        heading_style = ParagraphStyle('Heading', parent=styles['Heading2'], fontSize=12, textColor=title_color, spaceAfter=6, spaceBefore=12)
-
-        info = resume_data.get('personal_info', {})
-        story.append(Paragraph(info.get('name', ''), title_style))
-        story.append(Paragraph(f"{info.get('email', '')} | {info.get('phone', '')} | {info.get('location', '')}", styles['Normal']))
-        story.append(Spacer(1, 0.2 * inch))
-
-        if resume_data.get('summary'):
-            story.append(Paragraph('PROFESSIONAL SUMMARY', heading_style))
-            story.append(Paragraph(resume_data['summary'], styles['Normal']))
-            story.append(Spacer(1, 0.1 * inch))
-
-        section_order = {
-            "professional": ['education', 'skills', 'experience', 'projects'],
-            "modern": ['skills', 'experience', 'projects', 'education'],
-            "academic": ['education', 'experience', 'projects', 'skills']
-        }
-
-        for section in section_order.get(template_style, section_order['professional']):
-            if section == 'education' and resume_data.get('education'):
-                story.append(Paragraph('EDUCATION', heading_style))
-                for e in resume_data['education']:
-                    story.append(Paragraph(f"<b>{e.get('degree', '')}</b><br/>{e.get('institution', '')} | {e.get('year', '')}", styles['Normal']))
-            elif section == 'skills' and resume_data.get('skills'):
-                story.append(Paragraph('SKILLS', heading_style))
-                story.append(Paragraph(', '.join(resume_data['skills']), styles['Normal']))
-            elif section == 'experience' and resume_data.get('experience'):
-                story.append(Paragraph('WORK EXPERIENCE', heading_style))
-                for e in resume_data['experience']:
-                    story.append(Paragraph(f"<b>{e.get('title', '')}</b><br/>{e.get('company', '')} | {e.get('duration', '')}", styles['Normal']))
-                    for r in e.get('responsibilities', []):
-                        story.append(Paragraph(f"• {r}", styles['Normal']))
-            elif section == 'projects' and resume_data.get('projects'):
-                story.append(Paragraph('PROJECTS', heading_style))
-                for p in resume_data['projects']:
-                    story.append(Paragraph(f"<b>{p.get('name', '')}</b><br/>{p.get('description', '')}", styles['Normal']))
+    def pdf_from_layout(self, blocks: List[Block], template_style: str = "professional") -> bytes:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
+
+        template_style = _template(template_style)
+        # Fonts are embedded only when the standard ones would lose letters
+        fonts = unicode_fonts() if any(_has_unicode_letters(run.text) for item in blocks for run in item.runs) else None
+        covered = fonts[1] if fonts is not None else None
+        paragraph_styles, run_markup, rules = pdf_stylesheet(template_style, fonts is not None)
+        margins = TEMPLATES[template_style][0]['margins']
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer, pagesize=letter,
+            topMargin=margins['top'] * inch, bottomMargin=margins['bottom'] * inch,
+            leftMargin=margins['left'] * inch, rightMargin=margins['right'] * inch
+        )
+
+        story = []
+        for item in blocks:
+            if not item.runs:
+                story.append(Spacer(1, BASE_FONT_SIZE * 1.2))
+                continue
+            markup = ''.join(
+                _pdf_text(run.text, covered) if run.style is None
+                else run_markup[run.style][0] + _pdf_text(run.text, covered) + run_markup[run.style][1]
+                for run in item.runs
+            )
+            story.append(Paragraph(markup, paragraph_styles[item.style]))
+            if item.style in rules:
+                # Flowables keep layout state, so each document gets its own rule
+                story.append(HRFlowable(**rules[item.style]))
 
         doc.build(story)
-        return path
\ No newline at end of file
+        return buffer.getvalue()
+
+    def generate_docx(self, resume_data: Dict[str, Any], template_style: str = "professional", filename: str = "resume.docx") -> str:
+        return self.save(self.render_docx(resume_data, template_style), filename)
+
+    def generate_pdf(self, resume_data: Dict[str, Any], template_style: str = "professional", filename: str = "resume.pdf") -> str:
+        return self.save(self.render_pdf(resume_data, template_style), filename)
+
+    def save(self, data: bytes, filename: str) -> str:
+        """Write rendered bytes to output_dir and return the path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import threading
+import time
+
+
+class SessionStore:
+    """Bounded in-memory store of each session's structured resume and its renders.
+
+    Renders are kept as futures keyed by template style, so a template switch
+    waits on an in-flight background pre-render instead of repeating it.
+    Sessions are evicted least recently used first, or after ttl_seconds idle.
+    """
+
+    def __init__(self, max_sessions: int = 256, ttl_seconds: Optional[float] = 3600,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="prerender")
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, session_id: str, data: Any) -> None:
+        """Store a session's data, discarding renders made from its previous data"""
+        with self._lock:
+            self._sessions[session_id] = {'data': data, 'renders': {}, 'accessed_at': time.monotonic()}
+            self._sessions.move_to_end(session_id)
+            self._evict()
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return the session's data, or None when unknown or expired"""
+        with self._lock:
+            entry = self._touch(session_id)
+            return entry['data'] if entry is not None else None
+
+    def render(self, session_id: str, key: str, render: Callable[[Any], Any]) -> Future:
+        """Future for the session's render under key, starting render(data) in the background if needed"""
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is None:
+                raise KeyError(session_id)
+            future = entry['renders'].get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = entry['renders'][key] = self._executor.submit(render, entry['data'])
+            return future
+
+    def set_render(self, session_id: str, key: str, value: Any) -> None:
+        """Record a render produced outside the store"""
+        future = Future()
+        future.set_result(value)
+        with self._lock:
+            entry = self._touch(session_id)
+            if entry is not None:
+                entry['renders'][key] = future
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _touch(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if self.ttl_seconds is not None and now - entry['accessed_at'] > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        entry['accessed_at'] = now
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        if self.ttl_seconds is not None:
+            expired = [key for key, entry in self._sessions.items() if now - entry['accessed_at'] > self.ttl_seconds]
+            for key in expired:
+                del self._sessions[key]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
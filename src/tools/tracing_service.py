@@ -0,0 +1,280 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import bisect
+import json
+import os
+import secrets
+import threading
+import time
+
+# Histogram bucket upper bounds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1e3, 4e3, 16e3, 64e3, 256e3, 1e6, 4e6)
+
+# Span attributes that are summed into Prometheus counters, by metric name and label
+COUNTED_ATTRIBUTES = {
+    'llm.calls': ('resume_llm_calls_total', None),
+    'llm.rate_limited': ('resume_llm_rate_limited_total', None),
+    'llm.prompt_tokens': ('resume_llm_tokens_total', ('kind', 'prompt')),
+    'llm.completion_tokens': ('resume_llm_tokens_total', ('kind', 'completion')),
+    'cache.hits': ('resume_cache_requests_total', ('result', 'hit')),
+    'cache.misses': ('resume_cache_requests_total', ('result', 'miss')),
+    'enhance.candidates': ('resume_enhance_candidates_total', None),
+}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed pipeline stage with numeric and string attributes"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.duration = 0.0
+        self.error: Optional[str] = None
+        self.attributes: Dict[str, Any] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Increment a numeric attribute; safe from the threads a stage fans out to"""
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum:g}'
+        yield f'{name}_count{{{labels}}} {cumulative}'
+
+
+class Tracer:
+    """Collects pipeline spans and aggregates them into per-stage metrics.
+
+    Spans nest through a context variable, so stages run with asyncio tasks
+    or ``asyncio.to_thread`` are parented correctly. Lower layers such as
+    the LLM gateway and the result cache annotate whichever span is current.
+    Finished traces can be read as Prometheus text or OpenTelemetry (OTLP)
+    JSON, and are appended to ``export_path`` as OTLP JSON lines when set.
+    """
+
+    def __init__(self, service_name: str = "resume-builder", max_spans: int = 2048,
+                 export_path: Optional[str] = None):
+        self.service_name = service_name
+        self.export_path = export_path
+        self._spans = deque(maxlen=max_spans)
+        self._open_traces: Dict[str, List[Span]] = {}
+        self._durations: Dict[str, Histogram] = {}
+        self._sizes: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(name, parent.trace_id if parent is not None else secrets.token_hex(16),
+                    parent.span_id if parent is not None else None)
+        span.attributes.update(attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        else:
+            span.finish()
+        finally:
+            _current_span.reset(token)
+            self._record(span)
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current_span.get()
+
+    def add(self, key: str, amount: float = 1) -> None:
+        """Increment an attribute of the current span, if there is one"""
+        span = _current_span.get()
+        if span is not None:
+            span.add(key, amount)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def prometheus_text(self) -> str:
+        """Per-stage metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = ['# HELP resume_stage_duration_seconds Wall time of each pipeline stage',
+                     '# TYPE resume_stage_duration_seconds histogram']
+            for stage, histogram in sorted(self._durations.items()):
+                lines.extend(histogram.lines('resume_stage_duration_seconds', f'stage="{stage}"'))
+            lines += ['# HELP resume_stage_output_bytes Size of each stage\'s output',
+                      '# TYPE resume_stage_output_bytes histogram']
+            for stage, histogram in sorted(self._sizes.items()):
+                lines.extend(histogram.lines('resume_stage_output_bytes', f'stage="{stage}"'))
+            declared = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f'# TYPE {metric} counter')
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f'{metric}{{{label_text}}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def otel_json(self, spans: Optional[Iterable[Span]] = None) -> Dict[str, Any]:
+        """Spans (by default every buffered one) as an OTLP/JSON ExportTraceServiceRequest"""
+        spans = self.spans() if spans is None else spans
+        return {'resourceSpans': [{
+            'resource': {'attributes': [_otel_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{
+                'scope': {'name': 'src.tools.tracing_service'},
+                'spans': [_otel_span(span) for span in spans],
+            }],
+        }]}
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            self._durations.setdefault(span.name, Histogram(DURATION_BUCKETS)).observe(span.duration)
+            if 'output.bytes' in span.attributes:
+                self._sizes.setdefault(span.name, Histogram(SIZE_BUCKETS)).observe(span.attributes['output.bytes'])
+            if span.error is not None:
+                self._count('resume_stage_errors_total', span.name, None, 1)
+            for key, (metric, label) in COUNTED_ATTRIBUTES.items():
+                if key in span.attributes:
+                    self._count(metric, span.name, label, span.attributes[key])
+
+            trace = self._open_traces.setdefault(span.trace_id, [])
+            trace.append(span)
+            if span.parent_id is not None:
+                # Children that outlive their root never see it finish again
+                while len(self._open_traces) > self._spans.maxlen:
+                    del self._open_traces[next(iter(self._open_traces))]
+                return
+            del self._open_traces[span.trace_id]
+        if self.export_path:
+            self._export(trace)
+
+    def _count(self, metric: str, stage: str, label: Optional[Tuple[str, str]], amount: float) -> None:
+        labels = (('stage', stage),) + ((label,) if label else ())
+        self._counters[(metric, labels)] = self._counters.get((metric, labels), 0) + amount
+
+    def _export(self, trace: List[Span]) -> None:
+        line = json.dumps(self.otel_json(trace))
+        with self._lock, open(self.export_path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+
+def _otel_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+def _otel_span(span: Span) -> Dict[str, Any]:
+    data = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': 1,  # SPAN_KIND_INTERNAL
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns or span.start_ns),
+        'attributes': [_otel_attribute(key, value) for key, value in sorted(span.attributes.items())],
+        # STATUS_CODE_OK / STATUS_CODE_ERROR
+        'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+    }
+    if span.parent_id is not None:
+        data['parentSpanId'] = span.parent_id
+    return data
+
+
+def output_size(value: Any) -> Optional[int]:
+    """Size in bytes of a stage result, for the kinds of results stages return"""
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict) and isinstance(value.get('text'), str):
+        # Parse results are measured by their text
+        return output_size(value['text'])
+    if isinstance(value, (tuple, list)) and value and all(isinstance(item, (bytes, str)) for item in value):
+        return sum(output_size(item) for item in value)
+    if hasattr(value, 'model_dump_json'):
+        return len(value.model_dump_json().encode('utf-8'))
+    return None
+
+
+def start_metrics_server(port: int, tracer: Optional[Tracer] = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` in Prometheus text format from a daemon thread"""
+    tracer = tracer or get_tracer()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = tracer.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer shared by the pipeline, the LLM gateway and the caches"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(export_path=os.getenv('TRACE_EXPORT_PATH') or None)
+        return _tracer